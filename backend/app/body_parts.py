@@ -1,106 +1,100 @@
 """Body part mappings and pose metadata for session generation"""
 
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PoseMetadata(NamedTuple):
+    """Static metadata for a pose"""
+
+    base_duration: int  # seconds
+    difficulty: str  # "easy", "medium" or "hard"
+    targets: tuple[str, ...]
+
+
 # Pose metadata with base durations (seconds) and difficulty levels
-POSE_METADATA = {
-    "Mountain Pose": {
-        "base_duration": 60,
-        "difficulty": "easy",
-        "targets": ["posture", "alignment", "balance"],
-    },
-    "Warrior II Left": {
-        "base_duration": 45,
-        "difficulty": "medium",
-        "targets": ["legs", "hips", "balance", "shoulders"],
-    },
-    "Warrior II Right": {
-        "base_duration": 45,
-        "difficulty": "medium",
-        "targets": ["legs", "hips", "balance", "shoulders"],
-    },
-    "Tree Pose Left": {
-        "base_duration": 45,
-        "difficulty": "medium",
-        "targets": ["balance", "legs", "hips", "focus"],
-    },
-    "Tree Pose Right": {
-        "base_duration": 45,
-        "difficulty": "medium",
-        "targets": ["balance", "legs", "hips", "focus"],
-    },
-    "Downward Dog": {
-        "base_duration": 45,
-        "difficulty": "medium",
-        "targets": ["back", "shoulders", "hamstrings", "core"],
-    },
-    "Plank": {
-        "base_duration": 30,
-        "difficulty": "hard",
-        "targets": ["core", "shoulders", "back", "arms"],
-    },
-    "Supine Bound Angle": {
-        "base_duration": 90,
-        "difficulty": "easy",
-        "targets": ["hips", "groin", "inner_thighs", "relaxation"],
-    },
-    "Hug the Knees": {
-        "base_duration": 60,
-        "difficulty": "easy",
-        "targets": ["lower_back", "hips", "relaxation"],
-    },
-    "Easy Seat": {
-        "base_duration": 90,
-        "difficulty": "easy",
-        "targets": ["hips", "posture", "meditation"],
-    },
-    "Seated Hands Behind Back Stretch": {
-        "base_duration": 60,
-        "difficulty": "easy",
-        "targets": ["shoulders", "chest", "upper_back"],
-    },
-    "Gomukasana Legs Fold": {
-        "base_duration": 75,
-        "difficulty": "medium",
-        "targets": ["hips", "flexibility"],
-    },
-    "Janu Sirsasana Twist Left": {
-        "base_duration": 60,
-        "difficulty": "medium",
-        "targets": ["hamstrings", "spine", "hips"],
-    },
-    "Janu Sirsasana Twist Right": {
-        "base_duration": 60,
-        "difficulty": "medium",
-        "targets": ["hamstrings", "spine", "hips"],
-    },
-    "Janu Sirsasana Revolved Left": {
-        "base_duration": 60,
-        "difficulty": "medium",
-        "targets": ["hamstrings", "spine", "hips", "twist"],
-    },
-    "Janu Sirsasana Revolved Right": {
-        "base_duration": 60,
-        "difficulty": "medium",
-        "targets": ["hamstrings", "spine", "hips", "twist"],
-    },
-    "Reverse Table Top": {
-        "base_duration": 30,
-        "difficulty": "hard",
-        "targets": ["core", "shoulders", "chest", "wrists"],
-    },
-    "Supine Bent Knees": {
-        "base_duration": 90,
-        "difficulty": "easy",
-        "targets": ["lower_back", "relaxation"],
-    },
+POSE_METADATA: dict[str, PoseMetadata] = {
+    "Mountain Pose": PoseMetadata(
+        base_duration=60, difficulty="easy", targets=("posture", "alignment", "balance")
+    ),
+    "Warrior II Left": PoseMetadata(
+        base_duration=45, difficulty="medium", targets=("legs", "hips", "balance", "shoulders")
+    ),
+    "Warrior II Right": PoseMetadata(
+        base_duration=45, difficulty="medium", targets=("legs", "hips", "balance", "shoulders")
+    ),
+    "Tree Pose Left": PoseMetadata(
+        base_duration=45, difficulty="medium", targets=("balance", "legs", "hips", "focus")
+    ),
+    "Tree Pose Right": PoseMetadata(
+        base_duration=45, difficulty="medium", targets=("balance", "legs", "hips", "focus")
+    ),
+    "Downward Dog": PoseMetadata(
+        base_duration=45, difficulty="medium", targets=("back", "shoulders", "hamstrings", "core")
+    ),
+    "Plank": PoseMetadata(
+        base_duration=30, difficulty="hard", targets=("core", "shoulders", "back", "arms")
+    ),
+    "Supine Bound Angle": PoseMetadata(
+        base_duration=90, difficulty="easy", targets=("hips", "groin", "inner_thighs", "relaxation")
+    ),
+    "Hug the Knees": PoseMetadata(
+        base_duration=60, difficulty="easy", targets=("lower_back", "hips", "relaxation")
+    ),
+    "Easy Seat": PoseMetadata(
+        base_duration=90, difficulty="easy", targets=("hips", "posture", "meditation")
+    ),
+    "Seated Hands Behind Back Stretch": PoseMetadata(
+        base_duration=60, difficulty="easy", targets=("shoulders", "chest", "upper_back")
+    ),
+    "Gomukasana Legs Fold": PoseMetadata(
+        base_duration=75, difficulty="medium", targets=("hips", "flexibility")
+    ),
+    "Janu Sirsasana Twist Left": PoseMetadata(
+        base_duration=60, difficulty="medium", targets=("hamstrings", "spine", "hips")
+    ),
+    "Janu Sirsasana Twist Right": PoseMetadata(
+        base_duration=60, difficulty="medium", targets=("hamstrings", "spine", "hips")
+    ),
+    "Janu Sirsasana Revolved Left": PoseMetadata(
+        base_duration=60, difficulty="medium", targets=("hamstrings", "spine", "hips", "twist")
+    ),
+    "Janu Sirsasana Revolved Right": PoseMetadata(
+        base_duration=60, difficulty="medium", targets=("hamstrings", "spine", "hips", "twist")
+    ),
+    "Reverse Table Top": PoseMetadata(
+        base_duration=30, difficulty="hard", targets=("core", "shoulders", "chest", "wrists")
+    ),
+    "Supine Bent Knees": PoseMetadata(
+        base_duration=90, difficulty="easy", targets=("lower_back", "relaxation")
+    ),
 }
 
+# Difficulty label -> compact integer code
+DIFFICULTY_CODES: dict[str, int] = {"easy": 0, "medium": 1, "hard": 2}
+
+# Structure-of-arrays view of POSE_METADATA, aligned by pose index
+POSE_NAMES: list[str] = list(POSE_METADATA)
+POSE_INDEX: dict[str, int] = {name: i for i, name in enumerate(POSE_NAMES)}
+POSE_BASE_DURATION = np.array(
+    [POSE_METADATA[name].base_duration for name in POSE_NAMES], dtype=np.int16
+)
+POSE_DIFFICULTY = np.array(
+    [DIFFICULTY_CODES[POSE_METADATA[name].difficulty] for name in POSE_NAMES], dtype=np.uint8
+)
+
+POSE_BASE_DURATION.setflags(write=False)
+POSE_DIFFICULTY.setflags(write=False)
+
 # Body part to pose mappings
-BODY_PART_POSES = {
-    "neck": ["Easy Seat", "Seated Hands Behind Back Stretch", "Mountain Pose"],
-    "shoulders": ["Downward Dog", "Reverse Table Top", "Seated Hands Behind Back Stretch", "Plank"],
-    "upper_back": ["Downward Dog", "Seated Hands Behind Back Stretch", "Reverse Table Top"],
-    "lower_back": ["Hug the Knees", "Supine Bent Knees", "Downward Dog", "Easy Seat"],
-    "hips": [
+BODY_PART_POSES: dict[str, tuple[str, ...]] = {
+    "neck": ("Easy Seat", "Seated Hands Behind Back Stretch", "Mountain Pose"),
+    "shoulders": ("Downward Dog", "Reverse Table Top", "Seated Hands Behind Back Stretch", "Plank"),
+    "upper_back": ("Downward Dog", "Seated Hands Behind Back Stretch", "Reverse Table Top"),
+    "lower_back": ("Hug the Knees", "Supine Bent Knees", "Downward Dog", "Easy Seat"),
+    "hips": (
         "Supine Bound Angle",
         "Gomukasana Legs Fold",
         "Warrior II Left",
@@ -110,22 +104,25 @@ BODY_PART_POSES = {
         "Janu Sirsasana Twist Left",
         "Janu Sirsasana Twist Right",
         "Easy Seat",
-    ],
-    "knees": ["Easy Seat", "Supine Bent Knees"],
-    "hamstrings": ["Downward Dog", "Janu Sirsasana Twist Left", "Janu Sirsasana Twist Right"],
-    "core": ["Plank", "Reverse Table Top", "Downward Dog"],
-    "balance": ["Tree Pose Left", "Tree Pose Right", "Warrior II Left", "Warrior II Right"],
-    "flexibility": [
+    ),
+    "knees": ("Easy Seat", "Supine Bent Knees"),
+    "hamstrings": ("Downward Dog", "Janu Sirsasana Twist Left", "Janu Sirsasana Twist Right"),
+    "core": ("Plank", "Reverse Table Top", "Downward Dog"),
+    "balance": ("Tree Pose Left", "Tree Pose Right", "Warrior II Left", "Warrior II Right"),
+    "flexibility": (
         "Downward Dog",
         "Gomukasana Legs Fold",
         "Janu Sirsasana Revolved Left",
         "Janu Sirsasana Revolved Right",
         "Supine Bound Angle",
-    ],
-    "stress_relief": ["Easy Seat", "Supine Bound Angle", "Supine Bent Knees", "Hug the Knees"],
-    "posture": ["Mountain Pose", "Easy Seat", "Downward Dog"],
+    ),
+    "stress_relief": ("Easy Seat", "Supine Bound Angle", "Supine Bent Knees", "Hug the Knees"),
+    "posture": ("Mountain Pose", "Easy Seat", "Downward Dog"),
 }
 
+# Declaration order of body parts, used to keep results deterministic
+_BODY_PART_RANK: dict[str, int] = {body_part: i for i, body_part in enumerate(BODY_PART_POSES)}
+
 # Asymmetrical pose pairs (must be practiced on both sides)
 ASYMMETRIC_POSE_PAIRS = [
     ("Warrior II Left", "Warrior II Right"),
@@ -134,31 +131,71 @@ ASYMMETRIC_POSE_PAIRS = [
     ("Janu Sirsasana Revolved Left", "Janu Sirsasana Revolved Right"),
 ]
 
+# Partner lookup for asymmetrical poses (both directions)
+_ASYMMETRIC_PAIR_MAP: dict[str, str] = {}
+for _left, _right in ASYMMETRIC_POSE_PAIRS:
+    _ASYMMETRIC_PAIR_MAP[_left] = _right
+    _ASYMMETRIC_PAIR_MAP[_right] = _left
+
+# Every pose that belongs to an asymmetrical pair
+ASYMMETRIC_POSES: frozenset[str] = frozenset(_ASYMMETRIC_PAIR_MAP)
+
+# Partner pose index per pose, aligned with POSE_NAMES; -1 for symmetrical poses
+POSE_PARTNER = np.array(
+    [POSE_INDEX.get(_ASYMMETRIC_PAIR_MAP.get(name), -1) for name in POSE_NAMES], dtype=np.int8
+)
+POSE_PARTNER.setflags(write=False)
+
 # Pose flow categories for sequencing
-WARMUP_POSES = ["Mountain Pose", "Easy Seat", "Seated Hands Behind Back Stretch"]
-PEAK_POSES = ["Warrior II Left", "Warrior II Right", "Plank", "Reverse Table Top", "Downward Dog"]
-COOLDOWN_POSES = ["Supine Bound Angle", "Hug the Knees", "Supine Bent Knees", "Easy Seat"]
+WARMUP_POSES = frozenset(("Mountain Pose", "Easy Seat", "Seated Hands Behind Back Stretch"))
+PEAK_POSES = frozenset(
+    ("Warrior II Left", "Warrior II Right", "Plank", "Reverse Table Top", "Downward Dog")
+)
+COOLDOWN_POSES = frozenset(
+    ("Supine Bound Angle", "Hug the Knees", "Supine Bent Knees", "Easy Seat")
+)
+
+# Flow category code per pose, aligned with POSE_NAMES
+CATEGORY_WARMUP, CATEGORY_PEAK, CATEGORY_COOLDOWN, CATEGORY_OTHER = 0, 1, 2, 3
+
+
+def _flow_category(pose_name: str) -> int:
+    """Category code for a pose (warmup takes precedence, as in session ordering)"""
+    if pose_name in WARMUP_POSES:
+        return CATEGORY_WARMUP
+    if pose_name in PEAK_POSES:
+        return CATEGORY_PEAK
+    if pose_name in COOLDOWN_POSES:
+        return CATEGORY_COOLDOWN
+    return CATEGORY_OTHER
+
+
+POSE_CATEGORY = np.array([_flow_category(name) for name in POSE_NAMES], dtype=np.uint8)
+POSE_CATEGORY.setflags(write=False)
 
 
 def get_poses_for_body_parts(body_parts: list[str]) -> list[str]:
     """Get all poses that target the specified body parts"""
-    poses = set()
-    for body_part in body_parts:
-        if body_part in BODY_PART_POSES:
-            poses.update(BODY_PART_POSES[body_part])
-    return list(poses)
+    return list(_poses_for_body_parts(frozenset(body_parts)))
+
+
+@lru_cache(maxsize=256)
+def _poses_for_body_parts(body_parts: frozenset[str]) -> tuple[str, ...]:
+    """Cached, deduplicated poses for a set of body parts in BODY_PART_POSES order"""
+    valid = sorted(BODY_PART_POSES.keys() & body_parts, key=_BODY_PART_RANK.__getitem__)
+    return tuple(dict.fromkeys(pose for body_part in valid for pose in BODY_PART_POSES[body_part]))
 
 
 def is_asymmetric_pose(pose_name: str) -> bool:
     """Check if a pose is asymmetrical and requires a pair"""
-    return any(pose_name in (left, right) for left, right in ASYMMETRIC_POSE_PAIRS)
+    return pose_name in ASYMMETRIC_POSES
 
 
-def get_pose_pair(pose_name: str) -> str:
+def get_pose_pair(pose_name: str) -> str | None:
     """Get the paired pose for an asymmetrical pose"""
-    for left, right in ASYMMETRIC_POSE_PAIRS:
-        if pose_name == left:
-            return right
-        if pose_name == right:
-            return left
-    return None
+    return _ASYMMETRIC_PAIR_MAP.get(pose_name)
+
+
+def with_pose_pairs(poses: set[str] | frozenset[str]) -> set[str]:
+    """Get the given poses plus the partner of every asymmetrical pose among them"""
+    return poses | {_ASYMMETRIC_PAIR_MAP[pose] for pose in poses & ASYMMETRIC_POSES}
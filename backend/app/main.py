@@ -5,17 +5,24 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .session_routes import router as session_router
+from .utils.log_queue import setup_queue_logging
 from .websocket import sio
 
+# Application logs are written from a listener thread, never on the event loop
+setup_queue_logging(__package__)
+
 app = FastAPI(title="Alili - Yoga Pose Recognition API")
 
 # Configure CORS - use CORS_ORIGINS env var in production
 cors_origins_env = os.getenv("CORS_ORIGINS", "")
+# Origins are parsed once into a frozenset so per-request origin checks are hash lookups
 if cors_origins_env:
-    cors_origins = [origin.strip() for origin in cors_origins_env.split(",")]
+    cors_origins = frozenset(
+        origin.strip() for origin in cors_origins_env.split(",") if origin.strip()
+    )
     allow_credentials = True
 else:
-    cors_origins = ["*"]
+    cors_origins = frozenset(("*",))
     allow_credentials = False  # Must be False with wildcard origins per CORS spec
 
 app.add_middleware(
@@ -29,7 +36,8 @@ app.add_middleware(
 # Include routers
 app.include_router(session_router)
 
-# Mount Socket.IO app
+# Mount Socket.IO app - this combined ASGI app is the server entrypoint
+# (uvicorn app.main:socket_app); non-Socket.IO paths are forwarded to `app`
 socket_app = socketio.ASGIApp(sio, app)
 
 
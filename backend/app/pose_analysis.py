@@ -1,4 +1,335 @@
-from .utils.geometry import calculate_angle
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from .utils.landmarks import (
+    LEFT_ANKLE,
+    LEFT_ELBOW,
+    LEFT_HIP,
+    LEFT_KNEE,
+    LEFT_SHOULDER,
+    LEFT_WRIST,
+    NOSE,
+    NUM_LANDMARKS,
+    RIGHT_ANKLE,
+    RIGHT_ELBOW,
+    RIGHT_HIP,
+    RIGHT_KNEE,
+    RIGHT_SHOULDER,
+    RIGHT_WRIST,
+    landmarks_to_array,
+)
+from .utils.lru import LRUCache
+
+# Held poses repeat near-identical frames: feedback is memoized per pose on x, y
+# coordinates snapped to a 1/QUANTIZATION grid
+QUANTIZATION = 64
+FEEDBACK_CACHE_SIZE = 256
+
+# Joint angles computed once per frame, as (first, vertex, last) landmark indices
+ANGLE_TRIPLETS = np.array(
+    [
+        [LEFT_HIP, LEFT_KNEE, LEFT_ANKLE],  # left knee
+        [RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE],  # right knee
+        [LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST],  # left elbow
+        [RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST],  # right elbow
+    ],
+    dtype=np.intp,
+)
+LEFT_KNEE_ANGLE, RIGHT_KNEE_ANGLE, LEFT_ELBOW_ANGLE, RIGHT_ELBOW_ANGLE = range(len(ANGLE_TRIPLETS))
+
+# Virtual landmarks appended after the 33 detected ones: midpoints of landmark pairs
+MIDPOINT_PAIRS = np.array([[LEFT_SHOULDER, RIGHT_SHOULDER], [LEFT_HIP, RIGHT_HIP]], dtype=np.intp)
+SHOULDERS, HIPS = range(NUM_LANDMARKS, NUM_LANDMARKS + len(MIDPOINT_PAIRS))
+
+# Coordinate axes
+X, Y = 0, 1
+
+# Check kinds
+DIFF_GT = 0  # a - b > threshold along axis
+ABS_DIFF_GT = 1  # |a - b| > threshold along axis
+ABS_DIFF_LT = 2  # |a - b| < threshold along axis
+ANGLE_LT = 3  # joint angle a < threshold degrees
+ANGLE_GT = 4  # joint angle a > threshold degrees
+
+
+class Check(NamedTuple):
+    """A single threshold comparison on landmarks or joint angles"""
+
+    kind: int
+    axis: int
+    a: int  # landmark index (including virtual midpoints) or joint
+    b: int
+    threshold: float
+
+
+class Rule(NamedTuple):
+    """Feedback message emitted when any of its checks holds"""
+
+    checks: tuple[Check, ...]
+    message: str
+    unless: int = -1  # index of an earlier rule that suppresses this one
+
+
+# Shorthand constructors for the rule table below
+def _rule(message: str, *checks: Check, unless: int = -1) -> Rule:
+    return Rule(checks, message, unless)
+
+
+def _diff_gt(axis: int, a, b, threshold: float) -> Check:
+    return Check(DIFF_GT, axis, a, b, threshold)
+
+
+def _abs_diff_gt(axis: int, a, b, threshold: float) -> Check:
+    return Check(ABS_DIFF_GT, axis, a, b, threshold)
+
+
+def _abs_diff_lt(axis: int, a, b, threshold: float) -> Check:
+    return Check(ABS_DIFF_LT, axis, a, b, threshold)
+
+
+def _angle_lt(joint: int, threshold: float) -> Check:
+    return Check(ANGLE_LT, 0, joint, joint, threshold)
+
+
+def _angle_gt(joint: int, threshold: float) -> Check:
+    return Check(ANGLE_GT, 0, joint, joint, threshold)
+
+
+# Feedback rules per pose, evaluated in order
+POSE_RULES: dict[str, tuple[Rule, ...]] = {
+    "Mountain Pose": (
+        _rule(
+            "Level your shoulders - right shoulder is lower",
+            _diff_gt(Y, RIGHT_SHOULDER, LEFT_SHOULDER, 0.05),
+        ),
+        _rule(
+            "Level your shoulders - left shoulder is lower",
+            _diff_gt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.05),
+        ),
+        _rule("Keep your hips level", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.05)),
+        _rule("Keep your legs straight and aligned", _abs_diff_gt(X, LEFT_KNEE, LEFT_ANKLE, 0.1)),
+    ),
+    "Warrior II Left": (
+        _rule("Bend your left knee more - aim for 90 degrees", _angle_lt(LEFT_KNEE_ANGLE, 80)),
+        _rule("Don't bend your left knee too much", _angle_gt(LEFT_KNEE_ANGLE, 100)),
+        _rule("Keep your left knee over your ankle", _abs_diff_gt(X, LEFT_KNEE, LEFT_ANKLE, 0.05)),
+        _rule(
+            "Extend your left arm at shoulder height",
+            _abs_diff_gt(Y, LEFT_WRIST, LEFT_SHOULDER, 0.1),
+        ),
+        _rule(
+            "Extend your right arm at shoulder height",
+            _abs_diff_gt(Y, RIGHT_WRIST, RIGHT_SHOULDER, 0.1),
+        ),
+    ),
+    "Warrior II Right": (
+        _rule("Bend your right knee more - aim for 90 degrees", _angle_lt(RIGHT_KNEE_ANGLE, 80)),
+        _rule("Don't bend your right knee too much", _angle_gt(RIGHT_KNEE_ANGLE, 100)),
+        _rule(
+            "Keep your right knee over your ankle", _abs_diff_gt(X, RIGHT_KNEE, RIGHT_ANKLE, 0.05)
+        ),
+        _rule(
+            "Extend your left arm at shoulder height",
+            _abs_diff_gt(Y, LEFT_WRIST, LEFT_SHOULDER, 0.1),
+        ),
+        _rule(
+            "Extend your right arm at shoulder height",
+            _abs_diff_gt(Y, RIGHT_WRIST, RIGHT_SHOULDER, 0.1),
+        ),
+    ),
+    "Tree Pose Left": (
+        _rule("Keep your left standing leg straight", _angle_lt(LEFT_KNEE_ANGLE, 170)),
+        _rule(
+            "Try to raise your right foot higher on the inner thigh",
+            _diff_gt(Y, RIGHT_ANKLE, LEFT_KNEE, 0),
+        ),
+        _rule("Keep your hips level", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.08)),
+        _rule("Center your body over your left leg", _abs_diff_gt(X, NOSE, HIPS, 0.1)),
+    ),
+    "Tree Pose Right": (
+        _rule("Keep your right standing leg straight", _angle_lt(RIGHT_KNEE_ANGLE, 170)),
+        _rule(
+            "Try to raise your left foot higher on the inner thigh",
+            _diff_gt(Y, LEFT_ANKLE, RIGHT_KNEE, 0),
+        ),
+        _rule("Keep your hips level", _abs_diff_gt(Y, RIGHT_HIP, LEFT_HIP, 0.08)),
+        _rule("Center your body over your right leg", _abs_diff_gt(X, NOSE, HIPS, 0.1)),
+    ),
+    "Downward Dog": (
+        _rule(
+            "Straighten your legs more",
+            _angle_lt(LEFT_KNEE_ANGLE, 160),
+            _angle_lt(RIGHT_KNEE_ANGLE, 160),
+        ),
+        _rule(
+            "Straighten your arms",
+            _angle_lt(LEFT_ELBOW_ANGLE, 160),
+            _angle_lt(RIGHT_ELBOW_ANGLE, 160),
+        ),
+        _rule("Lift your hips higher", _diff_gt(Y, NOSE, HIPS, 0)),
+    ),
+    "Plank": (
+        _rule("Engage your core - don't let your hips sag", _diff_gt(Y, HIPS, SHOULDERS, 0.1)),
+        _rule(
+            "Lower your hips - keep your body in a straight line",
+            _diff_gt(Y, SHOULDERS, HIPS, 0.05),
+        ),
+        _rule(
+            "Keep your arms straight",
+            _angle_lt(LEFT_ELBOW_ANGLE, 160),
+            _angle_lt(RIGHT_ELBOW_ANGLE, 160),
+        ),
+        _rule(
+            "Keep your shoulders over your wrists", _abs_diff_gt(X, LEFT_SHOULDER, LEFT_WRIST, 0.1)
+        ),
+    ),
+    "Supine Bound Angle": (
+        _rule(
+            "Let your knees fall outward naturally",
+            _angle_lt(LEFT_KNEE_ANGLE, 40),
+            _angle_lt(RIGHT_KNEE_ANGLE, 40),
+        ),
+        _rule(
+            "Bring the soles of your feet closer together",
+            _angle_gt(LEFT_KNEE_ANGLE, 70),
+            _angle_gt(RIGHT_KNEE_ANGLE, 70),
+            unless=0,
+        ),
+        _rule("Keep your hips level and relaxed", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.08)),
+    ),
+    "Hug the Knees": (
+        _rule(
+            "Draw your knees closer to your chest",
+            _diff_gt(Y, LEFT_KNEE, NOSE, 0.2),
+            _diff_gt(Y, RIGHT_KNEE, NOSE, 0.2),
+        ),
+        _rule("Keep both knees at the same height", _abs_diff_gt(Y, LEFT_KNEE, RIGHT_KNEE, 0.1)),
+        _rule(
+            "Relax your shoulders and keep them level",
+            _abs_diff_gt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.08),
+        ),
+    ),
+    "Easy Seat": (
+        _rule("Sit up taller - lengthen your spine", _diff_gt(Y, SHOULDERS, HIPS, 0.05)),
+        _rule("Level your shoulders", _abs_diff_gt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.08)),
+        _rule(
+            "Balance your weight evenly on both hips", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.08)
+        ),
+    ),
+    "Seated Hands Behind Back Stretch": (
+        _rule(
+            "Move your hands further behind your back",
+            _diff_gt(X, LEFT_SHOULDER, LEFT_ELBOW, -0.05),
+        ),
+        _rule("Keep your shoulders level", _abs_diff_gt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.08)),
+        _rule("Sit up taller and lengthen your spine", _diff_gt(Y, SHOULDERS, HIPS, 0.05)),
+    ),
+    "Gomukasana Legs Fold": (
+        _rule(
+            "Bring your knees closer together - stack them",
+            _abs_diff_gt(X, LEFT_KNEE, RIGHT_KNEE, 0.15),
+        ),
+        _rule("Sit up tall - keep your spine straight", _diff_gt(Y, SHOULDERS, HIPS, 0.05)),
+        _rule("Keep your hips square and balanced", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.1)),
+    ),
+    "Janu Sirsasana Twist Left": (
+        _rule("Extend your left leg straight out in front", _angle_lt(LEFT_KNEE_ANGLE, 160)),
+        _rule(
+            "Bend your right knee more and bring foot to inner thigh",
+            _angle_gt(RIGHT_KNEE_ANGLE, 100),
+        ),
+        _rule(
+            "Twist deeper - rotate your torso toward the left",
+            _abs_diff_lt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.05),
+        ),
+        _rule("Fold forward over your left leg", _diff_gt(Y, NOSE, LEFT_ANKLE, -0.2)),
+    ),
+    "Janu Sirsasana Twist Right": (
+        _rule("Extend your right leg straight out in front", _angle_lt(RIGHT_KNEE_ANGLE, 160)),
+        _rule(
+            "Bend your left knee more and bring foot to inner thigh",
+            _angle_gt(LEFT_KNEE_ANGLE, 100),
+        ),
+        _rule(
+            "Twist deeper - rotate your torso toward the right",
+            _abs_diff_lt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.05),
+        ),
+        _rule("Fold forward over your right leg", _diff_gt(Y, NOSE, RIGHT_ANKLE, -0.2)),
+    ),
+    "Janu Sirsasana Revolved Left": (
+        _rule("Straighten your left leg fully", _angle_lt(LEFT_KNEE_ANGLE, 160)),
+        _rule("Bend your right knee to the side", _angle_gt(RIGHT_KNEE_ANGLE, 100)),
+        _rule(
+            "Fold deeper from your hips - hinge forward over left leg", _diff_gt(Y, NOSE, HIPS, 0)
+        ),
+        _rule("Keep lengthening your spine as you fold", _diff_gt(Y, SHOULDERS, HIPS, 0.05)),
+    ),
+    "Janu Sirsasana Revolved Right": (
+        _rule("Straighten your right leg fully", _angle_lt(RIGHT_KNEE_ANGLE, 160)),
+        _rule("Bend your left knee to the side", _angle_gt(LEFT_KNEE_ANGLE, 100)),
+        _rule(
+            "Fold deeper from your hips - hinge forward over right leg", _diff_gt(Y, NOSE, HIPS, 0)
+        ),
+        _rule("Keep lengthening your spine as you fold", _diff_gt(Y, SHOULDERS, HIPS, 0.05)),
+    ),
+    "Reverse Table Top": (
+        _rule("Lift your hips higher - press through your hands", _diff_gt(Y, HIPS, SHOULDERS, 0)),
+        _rule(
+            "Straighten your arms - press firmly into the ground",
+            _angle_lt(LEFT_ELBOW_ANGLE, 160),
+            _angle_lt(RIGHT_ELBOW_ANGLE, 160),
+        ),
+        _rule(
+            "Keep your knees at 90 degrees - shins vertical",
+            _angle_lt(LEFT_KNEE_ANGLE, 80),
+            _angle_lt(RIGHT_KNEE_ANGLE, 80),
+        ),
+        _rule("Keep your hips level", _abs_diff_gt(Y, LEFT_HIP, RIGHT_HIP, 0.08)),
+    ),
+    "Supine Bent Knees": (
+        _rule(
+            "Let your knees bend more comfortably",
+            _angle_lt(LEFT_KNEE_ANGLE, 70),
+            _angle_lt(RIGHT_KNEE_ANGLE, 70),
+        ),
+        _rule(
+            "Bring your feet closer to your hips",
+            _angle_gt(LEFT_KNEE_ANGLE, 110),
+            _angle_gt(RIGHT_KNEE_ANGLE, 110),
+            unless=0,
+        ),
+        _rule("Widen your knees to hip-width apart", _abs_diff_lt(X, LEFT_KNEE, RIGHT_KNEE, 0.1)),
+        _rule("Bring your knees closer together", _abs_diff_gt(X, LEFT_KNEE, RIGHT_KNEE, 0.3)),
+        _rule(
+            "Relax your shoulders flat on the ground",
+            _abs_diff_gt(Y, LEFT_SHOULDER, RIGHT_SHOULDER, 0.08),
+        ),
+    ),
+}
+
+# Message used when no rule fires for a pose
+POSE_PRAISE: dict[str, str] = {
+    "Mountain Pose": "Great form! Maintain this position",
+    "Warrior II Left": "Excellent Warrior II Left form!",
+    "Warrior II Right": "Excellent Warrior II Right form!",
+    "Tree Pose Left": "Perfect balance on your left leg! Keep it up",
+    "Tree Pose Right": "Perfect balance on your right leg! Keep it up",
+    "Downward Dog": "Great Downward Dog!",
+    "Plank": "Perfect plank form!",
+    "Supine Bound Angle": "Excellent! Breathe deeply and relax into the pose",
+    "Hug the Knees": "Great! Keep breathing and gently hug your knees",
+    "Easy Seat": "Perfect seated posture! Stay grounded and tall",
+    "Seated Hands Behind Back Stretch": "Excellent chest opening! Feel the stretch",
+    "Gomukasana Legs Fold": "Great leg position! Hold and breathe",
+    "Janu Sirsasana Twist Left": "Beautiful twist to the left! Breathe into the stretch",
+    "Janu Sirsasana Twist Right": "Beautiful twist to the right! Breathe into the stretch",
+    "Janu Sirsasana Revolved Left": "Perfect forward fold over left leg! Hold and breathe",
+    "Janu Sirsasana Revolved Right": "Perfect forward fold over right leg! Hold and breathe",
+    "Reverse Table Top": "Excellent form! Engage your core",
+    "Supine Bent Knees": "Perfect! Relax and breathe deeply",
+}
 
 # Orientation feedback messages for guiding user to correct position
 ORIENTATION_MESSAGES: dict[str, str] = {
@@ -27,618 +358,171 @@ def get_orientation_feedback(_current: str, required: list[str]) -> str:
     return ORIENTATION_MESSAGES.get(target, f"Adjust your position for {target} view")
 
 
-class PoseQualityAnalyzer:
-    """Analyze pose quality and provide feedback"""
-
-    def __init__(self):
-        self.feedback_rules = {
-            "Mountain Pose": self._analyze_mountain_pose,
-            "Warrior II Left": self._analyze_warrior_two_left,
-            "Warrior II Right": self._analyze_warrior_two_right,
-            "Tree Pose Left": self._analyze_tree_pose_left,
-            "Tree Pose Right": self._analyze_tree_pose_right,
-            "Downward Dog": self._analyze_downward_dog,
-            "Plank": self._analyze_plank,
-            "Supine Bound Angle": self._analyze_supine_bound_angle,
-            "Hug the Knees": self._analyze_hug_knees,
-            "Easy Seat": self._analyze_easy_seat,
-            "Seated Hands Behind Back Stretch": self._analyze_seated_back_stretch,
-            "Gomukasana Legs Fold": self._analyze_gomukasana_legs,
-            "Janu Sirsasana Twist Left": self._analyze_janu_twist_left,
-            "Janu Sirsasana Twist Right": self._analyze_janu_twist_right,
-            "Janu Sirsasana Revolved Left": self._analyze_janu_revolved_left,
-            "Janu Sirsasana Revolved Right": self._analyze_janu_revolved_right,
-            "Reverse Table Top": self._analyze_reverse_table,
-            "Supine Bent Knees": self._analyze_supine_bent_knees,
-        }
-
-    def analyze(self, pose_name: str, landmarks: list[dict]) -> list[str]:
-        """
-        Analyze pose quality and generate feedback.
-
-        Args:
-            pose_name: Name of the detected pose
-            landmarks: List of landmark dictionaries
-
-        Returns:
-            List of feedback strings
-        """
-        if not landmarks or len(landmarks) < 33:
-            return ["Unable to analyze pose - not enough landmarks detected"]
-
-        if pose_name not in self.feedback_rules:
-            return []
-
-        return self.feedback_rules[pose_name](landmarks)
-
-    def _analyze_mountain_pose(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Mountain Pose (Tadasana)"""
-        feedback = []
-
-        # Check if shoulders are level
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        shoulder_diff = abs(left_shoulder["y"] - right_shoulder["y"])
-
-        if shoulder_diff > 0.05:
-            if left_shoulder["y"] < right_shoulder["y"]:
-                feedback.append("Level your shoulders - right shoulder is lower")
-            else:
-                feedback.append("Level your shoulders - left shoulder is lower")
-
-        # Check if hips are level
-        left_hip = landmarks[23]
-        right_hip = landmarks[24]
-        hip_diff = abs(left_hip["y"] - right_hip["y"])
-
-        if hip_diff > 0.05:
-            feedback.append("Keep your hips level")
-
-        # Check if standing straight
-        left_knee = landmarks[25]
-        left_ankle = landmarks[27]
-        if abs(left_knee["x"] - left_ankle["x"]) > 0.1:
-            feedback.append("Keep your legs straight and aligned")
-
-        if not feedback:
-            feedback.append("Great form! Maintain this position")
-
-        return feedback
-
-    def _analyze_warrior_two_left(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Warrior II Pose (Left leg forward)"""
-        feedback = []
-
-        # Check front knee alignment (left leg)
-        left_knee = landmarks[25]
-        left_ankle = landmarks[27]
-        left_hip = landmarks[23]
-
-        knee_angle = calculate_angle(left_hip, left_knee, left_ankle)
-
-        if knee_angle < 80:
-            feedback.append("Bend your left knee more - aim for 90 degrees")
-        elif knee_angle > 100:
-            feedback.append("Don't bend your left knee too much")
-
-        # Check if knee is over ankle
-        if abs(left_knee["x"] - left_ankle["x"]) > 0.05:
-            feedback.append("Keep your left knee over your ankle")
-
-        # Check arm alignment
-        left_wrist = landmarks[15]
-        right_wrist = landmarks[16]
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-
-        if abs(left_wrist["y"] - left_shoulder["y"]) > 0.1:
-            feedback.append("Extend your left arm at shoulder height")
-
-        if abs(right_wrist["y"] - right_shoulder["y"]) > 0.1:
-            feedback.append("Extend your right arm at shoulder height")
-
-        if not feedback:
-            feedback.append("Excellent Warrior II Left form!")
-
-        return feedback
-
-    def _analyze_warrior_two_right(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Warrior II Pose (Right leg forward)"""
-        feedback = []
-
-        # Check front knee alignment (right leg)
-        right_knee = landmarks[26]
-        right_ankle = landmarks[28]
-        right_hip = landmarks[24]
-
-        knee_angle = calculate_angle(right_hip, right_knee, right_ankle)
-
-        if knee_angle < 80:
-            feedback.append("Bend your right knee more - aim for 90 degrees")
-        elif knee_angle > 100:
-            feedback.append("Don't bend your right knee too much")
-
-        # Check if knee is over ankle
-        if abs(right_knee["x"] - right_ankle["x"]) > 0.05:
-            feedback.append("Keep your right knee over your ankle")
-
-        # Check arm alignment
-        left_wrist = landmarks[15]
-        right_wrist = landmarks[16]
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-
-        if abs(left_wrist["y"] - left_shoulder["y"]) > 0.1:
-            feedback.append("Extend your left arm at shoulder height")
-
-        if abs(right_wrist["y"] - right_shoulder["y"]) > 0.1:
-            feedback.append("Extend your right arm at shoulder height")
-
-        if not feedback:
-            feedback.append("Excellent Warrior II Right form!")
-
-        return feedback
-
-    def _analyze_tree_pose_left(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Tree Pose (Standing on left leg)"""
-        feedback = []
-
-        # Check balance - left standing leg should be straight
-        left_hip = landmarks[23]
-        left_knee = landmarks[25]
-        left_ankle = landmarks[27]
-
-        knee_angle = calculate_angle(left_hip, left_knee, left_ankle)
-
-        if knee_angle < 170:
-            feedback.append("Keep your left standing leg straight")
-
-        # Check if raised foot is at proper height
-        right_ankle = landmarks[28]
-        if right_ankle["y"] > left_knee["y"]:
-            feedback.append("Try to raise your right foot higher on the inner thigh")
-
-        # Check hip alignment
-        if abs(left_hip["y"] - landmarks[24]["y"]) > 0.08:
-            feedback.append("Keep your hips level")
-
-        # Check if standing straight
-        nose = landmarks[0]
-        mid_hip = (landmarks[23]["x"] + landmarks[24]["x"]) / 2
-        if abs(nose["x"] - mid_hip) > 0.1:
-            feedback.append("Center your body over your left leg")
-
-        if not feedback:
-            feedback.append("Perfect balance on your left leg! Keep it up")
-
-        return feedback
-
-    def _analyze_tree_pose_right(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Tree Pose (Standing on right leg)"""
-        feedback = []
-
-        # Check balance - right standing leg should be straight
-        right_hip = landmarks[24]
-        right_knee = landmarks[26]
-        right_ankle = landmarks[28]
-
-        knee_angle = calculate_angle(right_hip, right_knee, right_ankle)
-
-        if knee_angle < 170:
-            feedback.append("Keep your right standing leg straight")
-
-        # Check if raised foot is at proper height
-        left_ankle = landmarks[27]
-        if left_ankle["y"] > right_knee["y"]:
-            feedback.append("Try to raise your left foot higher on the inner thigh")
-
-        # Check hip alignment
-        if abs(right_hip["y"] - landmarks[23]["y"]) > 0.08:
-            feedback.append("Keep your hips level")
-
-        # Check if standing straight
-        nose = landmarks[0]
-        mid_hip = (landmarks[23]["x"] + landmarks[24]["x"]) / 2
-        if abs(nose["x"] - mid_hip) > 0.1:
-            feedback.append("Center your body over your right leg")
-
-        if not feedback:
-            feedback.append("Perfect balance on your right leg! Keep it up")
-
-        return feedback
-
-    def _analyze_downward_dog(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Downward Dog Pose"""
-        feedback = []
-
-        # Check if legs are straight
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        if left_knee_angle < 160 or right_knee_angle < 160:
-            feedback.append("Straighten your legs more")
-
-        # Check if arms are straight
-        left_elbow_angle = calculate_angle(landmarks[11], landmarks[13], landmarks[15])
-        right_elbow_angle = calculate_angle(landmarks[12], landmarks[14], landmarks[16])
-
-        if left_elbow_angle < 160 or right_elbow_angle < 160:
-            feedback.append("Straighten your arms")
-
-        # Check spine alignment
-        nose = landmarks[0]
-        mid_hip = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-        if nose["y"] > mid_hip:
-            feedback.append("Lift your hips higher")
-
-        if not feedback:
-            feedback.append("Great Downward Dog!")
-
-        return feedback
-
-    def _analyze_plank(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Plank Pose"""
-        feedback = []
-
-        # Check if body is in a straight line
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-
-        # Check if hips are sagging
-        if hips_y > shoulders_y + 0.1:
-            feedback.append("Engage your core - don't let your hips sag")
-
-        # Check if hips are too high
-        if hips_y < shoulders_y - 0.05:
-            feedback.append("Lower your hips - keep your body in a straight line")
-
-        # Check if arms are straight
-        left_elbow_angle = calculate_angle(landmarks[11], landmarks[13], landmarks[15])
-        right_elbow_angle = calculate_angle(landmarks[12], landmarks[14], landmarks[16])
-
-        if left_elbow_angle < 160 or right_elbow_angle < 160:
-            feedback.append("Keep your arms straight")
-
-        # Check shoulder alignment
-        left_shoulder = landmarks[11]
-        left_wrist = landmarks[15]
-        if abs(left_shoulder["x"] - left_wrist["x"]) > 0.1:
-            feedback.append("Keep your shoulders over your wrists")
-
-        if not feedback:
-            feedback.append("Perfect plank form!")
-
-        return feedback
-
-    def _analyze_supine_bound_angle(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Supine Bound Angle Pose (Baddha Konasana)"""
-        feedback = []
-
-        # Check knee bend
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        if left_knee_angle < 40 or right_knee_angle < 40:
-            feedback.append("Let your knees fall outward naturally")
-        elif left_knee_angle > 70 or right_knee_angle > 70:
-            feedback.append("Bring the soles of your feet closer together")
-
-        # Check hip symmetry
-        left_hip = landmarks[23]
-        right_hip = landmarks[24]
-        if abs(left_hip["y"] - right_hip["y"]) > 0.08:
-            feedback.append("Keep your hips level and relaxed")
-
-        if not feedback:
-            feedback.append("Excellent! Breathe deeply and relax into the pose")
-
-        return feedback
-
-    def _analyze_hug_knees(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Hug the Knees Pose"""
-        feedback = []
-
-        # Check if knees are pulled to chest
-        left_knee = landmarks[25]
-        right_knee = landmarks[26]
-        nose = landmarks[0]
-
-        # Knees should be close to upper body
-        if left_knee["y"] > nose["y"] + 0.2 or right_knee["y"] > nose["y"] + 0.2:
-            feedback.append("Draw your knees closer to your chest")
-
-        # Check knee symmetry
-        if abs(left_knee["y"] - right_knee["y"]) > 0.1:
-            feedback.append("Keep both knees at the same height")
-
-        # Check shoulder relaxation
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        if abs(left_shoulder["y"] - right_shoulder["y"]) > 0.08:
-            feedback.append("Relax your shoulders and keep them level")
-
-        if not feedback:
-            feedback.append("Great! Keep breathing and gently hug your knees")
-
-        return feedback
-
-    def _analyze_easy_seat(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Easy Seat Pose (Sukhasana)"""
-        feedback = []
-
-        # Check if sitting upright - shoulders above hips
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-
-        if shoulders_y > hips_y + 0.05:
-            feedback.append("Sit up taller - lengthen your spine")
-
-        # Check shoulder level
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        if abs(left_shoulder["y"] - right_shoulder["y"]) > 0.08:
-            feedback.append("Level your shoulders")
-
-        # Check hip level
-        left_hip = landmarks[23]
-        right_hip = landmarks[24]
-        if abs(left_hip["y"] - right_hip["y"]) > 0.08:
-            feedback.append("Balance your weight evenly on both hips")
-
-        if not feedback:
-            feedback.append("Perfect seated posture! Stay grounded and tall")
-
-        return feedback
-
-    def _analyze_seated_back_stretch(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Seated Hands Behind Back Stretch"""
-        feedback = []
-
-        # Check if chest is open - shoulders back
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        left_elbow = landmarks[13]
-
-        # Elbows should be behind shoulders for proper stretch
-        if left_elbow["x"] < left_shoulder["x"] + 0.05:
-            feedback.append("Move your hands further behind your back")
-
-        # Check shoulder level
-        if abs(left_shoulder["y"] - right_shoulder["y"]) > 0.08:
-            feedback.append("Keep your shoulders level")
-
-        # Check spine alignment - sitting tall
-        mid_hip = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-        shoulders_y = (left_shoulder["y"] + right_shoulder["y"]) / 2
-
-        if shoulders_y > mid_hip + 0.05:
-            feedback.append("Sit up taller and lengthen your spine")
-
-        if not feedback:
-            feedback.append("Excellent chest opening! Feel the stretch")
-
-        return feedback
-
-    def _analyze_gomukasana_legs(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Gomukasana Legs Fold (Cow Face Pose Legs)"""
-        feedback = []
-
-        # Check knee alignment - knees should be stacked
-        left_knee = landmarks[25]
-        right_knee = landmarks[26]
-
-        knee_distance = abs(left_knee["x"] - right_knee["x"])
-        if knee_distance > 0.15:
-            feedback.append("Bring your knees closer together - stack them")
-
-        # Check if sitting upright
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-
-        if shoulders_y > hips_y + 0.05:
-            feedback.append("Sit up tall - keep your spine straight")
-
-        # Check hip alignment
-        left_hip = landmarks[23]
-        right_hip = landmarks[24]
-        if abs(left_hip["y"] - right_hip["y"]) > 0.1:
-            feedback.append("Keep your hips square and balanced")
-
-        if not feedback:
-            feedback.append("Great leg position! Hold and breathe")
-
-        return feedback
-
-    def _analyze_janu_twist_left(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Janu Sirsasana Twist (Left leg extended)"""
-        feedback = []
-
-        # Check if left leg is extended
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        # Left leg should be straight (180°), right bent (90°)
-        if left_knee_angle < 160:
-            feedback.append("Extend your left leg straight out in front")
-        if right_knee_angle > 100:
-            feedback.append("Bend your right knee more and bring foot to inner thigh")
-
-        # Check spine rotation - shoulders should be different heights
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        shoulder_diff = abs(left_shoulder["y"] - right_shoulder["y"])
-
-        if shoulder_diff < 0.05:
-            feedback.append("Twist deeper - rotate your torso toward the left")
-
-        # Check forward fold over left leg
-        nose = landmarks[0]
-        left_ankle = landmarks[27]
-        if nose["y"] > left_ankle["y"] - 0.2:
-            feedback.append("Fold forward over your left leg")
-
-        if not feedback:
-            feedback.append("Beautiful twist to the left! Breathe into the stretch")
-
-        return feedback
-
-    def _analyze_janu_twist_right(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Janu Sirsasana Twist (Right leg extended)"""
-        feedback = []
-
-        # Check if right leg is extended
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        # Right leg should be straight (180°), left bent (90°)
-        if right_knee_angle < 160:
-            feedback.append("Extend your right leg straight out in front")
-        if left_knee_angle > 100:
-            feedback.append("Bend your left knee more and bring foot to inner thigh")
-
-        # Check spine rotation - shoulders should be different heights
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        shoulder_diff = abs(left_shoulder["y"] - right_shoulder["y"])
-
-        if shoulder_diff < 0.05:
-            feedback.append("Twist deeper - rotate your torso toward the right")
-
-        # Check forward fold over right leg
-        nose = landmarks[0]
-        right_ankle = landmarks[28]
-        if nose["y"] > right_ankle["y"] - 0.2:
-            feedback.append("Fold forward over your right leg")
-
-        if not feedback:
-            feedback.append("Beautiful twist to the right! Breathe into the stretch")
-
-        return feedback
-
-    def _analyze_janu_revolved_left(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Janu Sirsasana Revolved (Left leg extended)"""
-        feedback = []
-
-        # Check leg position - left straight, right bent
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        if left_knee_angle < 160:
-            feedback.append("Straighten your left leg fully")
-        if right_knee_angle > 100:
-            feedback.append("Bend your right knee to the side")
-
-        # Check forward fold depth
-        nose = landmarks[0]
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-
-        if nose["y"] > hips_y:
-            feedback.append("Fold deeper from your hips - hinge forward over left leg")
-
-        # Check spine alignment during fold
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-        if shoulders_y > hips_y + 0.05:
-            feedback.append("Keep lengthening your spine as you fold")
-
-        if not feedback:
-            feedback.append("Perfect forward fold over left leg! Hold and breathe")
-
-        return feedback
-
-    def _analyze_janu_revolved_right(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Janu Sirsasana Revolved (Right leg extended)"""
-        feedback = []
-
-        # Check leg position - right straight, left bent
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        if right_knee_angle < 160:
-            feedback.append("Straighten your right leg fully")
-        if left_knee_angle > 100:
-            feedback.append("Bend your left knee to the side")
-
-        # Check forward fold depth
-        nose = landmarks[0]
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-
-        if nose["y"] > hips_y:
-            feedback.append("Fold deeper from your hips - hinge forward over right leg")
-
-        # Check spine alignment during fold
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-        if shoulders_y > hips_y + 0.05:
-            feedback.append("Keep lengthening your spine as you fold")
-
-        if not feedback:
-            feedback.append("Perfect forward fold over right leg! Hold and breathe")
-
-        return feedback
-
-    def _analyze_reverse_table(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Reverse Table Top Pose"""
-        feedback = []
-
-        # Check if hips are lifted
-        hips_y = (landmarks[23]["y"] + landmarks[24]["y"]) / 2
-        shoulders_y = (landmarks[11]["y"] + landmarks[12]["y"]) / 2
-
-        if hips_y > shoulders_y:
-            feedback.append("Lift your hips higher - press through your hands")
+def _to_array(landmarks: list[dict] | np.ndarray) -> np.ndarray:
+    """Landmarks as a (33, 3) float32 array of x, y, z"""
+    return landmarks_to_array(landmarks)[:NUM_LANDMARKS, :3]
+
+
+def _with_midpoints(lm: np.ndarray) -> np.ndarray:
+    """Append the MIDPOINT_PAIRS virtual landmarks to a (..., 33, 3) landmark array"""
+    midpoints = lm[..., MIDPOINT_PAIRS, :].mean(axis=-2)
+    return np.concatenate((lm, midpoints), axis=-2)
+
+
+# Bit value of each rule index in a feedback bitmask
+_RULE_BITS = 1 << np.arange(32, dtype=np.uint32)
+
+
+class RulesArrays(NamedTuple):
+    """A pose's rules packed into arrays aligned by check, for vectorized evaluation"""
+
+    kinds: np.ndarray
+    axes: np.ndarray
+    idx_a: np.ndarray
+    idx_b: np.ndarray
+    joints: np.ndarray  # joint index for angle checks
+    sign: np.ndarray  # -1 where needed so every check reads value * sign > threshold
+    thresholds: np.ndarray  # already multiplied by sign; 0 for angle checks
+    cos_sq: np.ndarray  # c * |c| with c = cos(threshold angle), for angle checks
+    starts: np.ndarray  # first check of each rule
+    unless: np.ndarray
+    messages: tuple[str, ...]
+    praise: tuple[str]  # feedback returned when no rule fires
+
+
+def _compile_rules(rules: tuple[Rule, ...], praise: str) -> RulesArrays:
+    """Pack a pose's rules and praise message into RulesArrays"""
+    if len(rules) > len(_RULE_BITS):
+        raise ValueError(f"At most {len(_RULE_BITS)} rules per pose, got {len(rules)}")
+    checks = [(r, check) for r, rule in enumerate(rules) for check in rule.checks]
+    kinds = np.array([check.kind for _, check in checks], dtype=np.int8)
+    is_angle = kinds >= ANGLE_LT
+    # angle < T  <=>  cos(angle) > cos(T), so angle checks flip direction
+    sign = np.where((kinds == ABS_DIFF_LT) | (kinds == ANGLE_GT), -1, 1).astype(np.float32)
+    thresholds = np.array([check.threshold for _, check in checks], dtype=np.float32)
+    cos_thresholds = np.cos(np.radians(thresholds))
+    packed = RulesArrays(
+        kinds,
+        np.array([check.axis for _, check in checks], dtype=np.int32),
+        np.array([check.a for _, check in checks], dtype=np.int32),
+        np.array([check.b for _, check in checks], dtype=np.int32),
+        np.array([check.a if check.kind >= ANGLE_LT else 0 for _, check in checks], dtype=np.int32),
+        sign,
+        np.where(is_angle, 0, thresholds * sign).astype(np.float32),
+        np.where(is_angle, cos_thresholds * np.abs(cos_thresholds), 0).astype(np.float32),
+        np.cumsum([0] + [len(rule.checks) for rule in rules[:-1]]),
+        np.array([rule.unless for rule in rules], dtype=np.int32),
+        tuple(rule.message for rule in rules),
+        (praise,),
+    )
+    for array in packed[:-2]:
+        array.setflags(write=False)
+    return packed
+
+
+def _joint_terms(lm: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Angle terms for each ANGLE_TRIPLETS joint, without sqrt or trig.
 
-        # Check if arms are straight
-        left_elbow_angle = calculate_angle(landmarks[11], landmarks[13], landmarks[15])
-        right_elbow_angle = calculate_angle(landmarks[12], landmarks[14], landmarks[16])
+    cos(angle) > c holds exactly when dot * |dot| > c * |c| * |v1|^2 * |v2|^2,
+    so returning those two products is enough to test any angle threshold.
 
-        if left_elbow_angle < 160 or right_elbow_angle < 160:
-            feedback.append("Straighten your arms - press firmly into the ground")
+    Args:
+        lm: Landmark array of shape (33, 3)
 
-        # Check knee alignment
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
+    Returns:
+        Tuple of (dot * |dot|, |v1|^2 * |v2|^2) arrays with one entry per joint
+    """
+    xy = lm[..., :2]
+    vertex = xy[..., ANGLE_TRIPLETS[:, 1], :]
+    v1 = xy[..., ANGLE_TRIPLETS[:, 0], :] - vertex
+    v2 = xy[..., ANGLE_TRIPLETS[:, 2], :] - vertex
+    dot = (v1 * v2).sum(axis=-1)
+    norm_sq = (v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1)
+    # A zero-length limb has dot = 0; a unit norm scores it as 90 degrees, like calculate_angles
+    return dot * np.abs(dot), np.where(norm_sq == 0, 1.0, norm_sq)
+
+
+def _evaluate_rules(
+    lm: np.ndarray, joint_terms: tuple[np.ndarray, np.ndarray], rules: RulesArrays
+) -> np.ndarray:
+    """Boolean mask of the rules that fire"""
+    kinds, axes, idx_a, idx_b, joints, sign, thresholds, cos_sq, starts, unless, _, _ = rules
+    dot_sq, norm_sq = joint_terms
+    points = _with_midpoints(lm)
+    diff = points[..., idx_a, axes] - points[..., idx_b, axes]
+    angle_value = dot_sq[..., joints] - cos_sq * norm_sq[..., joints]
+    value = np.where(kinds == DIFF_GT, diff, np.where(kinds >= ANGLE_LT, angle_value, np.abs(diff)))
+    fired = np.logical_or.reduceat(value * sign > thresholds, starts, axis=-1)
+    suppressed = (unless >= 0) & fired[..., unless]
+    return fired & ~suppressed
+
+
+def _run_rules(lm: np.ndarray, rules: RulesArrays) -> int:
+    """Bitmask of the rules that fire; bit i is set when rule i fires"""
+    fired = _evaluate_rules(lm, _joint_terms(lm), rules)
+    return int(fired @ _RULE_BITS[: len(rules.messages)])
+
+
+def bitmask_to_messages(mask: int, rules: RulesArrays) -> tuple[str, ...]:
+    """
+    Build the feedback for a rule bitmask.
 
-        if left_knee_angle < 80 or right_knee_angle < 80:
-            feedback.append("Keep your knees at 90 degrees - shins vertical")
+    Args:
+        mask: Bitmask returned by the rule engine
+        rules: Packed rules the mask was computed from
 
-        # Check hip level
-        if abs(landmarks[23]["y"] - landmarks[24]["y"]) > 0.08:
-            feedback.append("Keep your hips level")
+    Returns:
+        Messages of the fired rules in rule order, or the pose's praise if none fired
+    """
+    if not mask:
+        return rules.praise
+    return tuple(message for i, message in enumerate(rules.messages) if mask >> i & 1)
 
-        if not feedback:
-            feedback.append("Excellent form! Engage your core")
 
-        return feedback
+_RULES: dict[str, RulesArrays] = {
+    sys.intern(name): _compile_rules(rules, POSE_PRAISE[name]) for name, rules in POSE_RULES.items()
+}
 
-    def _analyze_supine_bent_knees(self, landmarks: list[dict]) -> list[str]:
-        """Analyze Supine Bent Knees Pose"""
-        feedback = []
 
-        # Check knee bend angle
-        left_knee_angle = calculate_angle(landmarks[23], landmarks[25], landmarks[27])
-        right_knee_angle = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
+_INSUFFICIENT_LANDMARKS = ("Unable to analyze pose - not enough landmarks detected",)
 
-        if left_knee_angle < 70 or right_knee_angle < 70:
-            feedback.append("Let your knees bend more comfortably")
-        elif left_knee_angle > 110 or right_knee_angle > 110:
-            feedback.append("Bring your feet closer to your hips")
 
-        # Check knee alignment - should be hip-width apart
-        left_knee = landmarks[25]
-        right_knee = landmarks[26]
-        knee_distance = abs(left_knee["x"] - right_knee["x"])
+class PoseQualityAnalyzer:
+    """Analyze pose quality and provide feedback"""
 
-        if knee_distance < 0.1:
-            feedback.append("Widen your knees to hip-width apart")
-        elif knee_distance > 0.3:
-            feedback.append("Bring your knees closer together")
+    def __init__(self):
+        self._rules = _RULES
+        # Last (pose name, rules) looked up; poses are held across many frames
+        self._last: tuple[str, RulesArrays | None] = ("", None)
+        self._feedback_cache: LRUCache = LRUCache(FEEDBACK_CACHE_SIZE)
 
-        # Check shoulder relaxation
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        if abs(left_shoulder["y"] - right_shoulder["y"]) > 0.08:
-            feedback.append("Relax your shoulders flat on the ground")
+    def analyze(self, pose_name: str, landmarks: list[dict] | np.ndarray) -> tuple[str, ...]:
+        """
+        Analyze pose quality and generate feedback.
 
-        if not feedback:
-            feedback.append("Perfect! Relax and breathe deeply")
+        Args:
+            pose_name: Name of the detected pose
+            landmarks: List of landmark dictionaries, or an array with x, y, z columns
 
+        Returns:
+            Tuple of feedback strings
+        """
+        # len() covers both input types; an array's truth value is ambiguous
+        if landmarks is None or len(landmarks) < NUM_LANDMARKS:
+            return _INSUFFICIENT_LANDMARKS
+
+        last_name, rules = self._last
+        if pose_name != last_name:
+            rules = self._rules.get(pose_name)
+            self._last = (pose_name, rules)
+        if rules is None:
+            return ()
+
+        lm = _to_array(landmarks)
+        key = (pose_name, np.round(lm[:, :2] * QUANTIZATION).astype(np.int16).tobytes())
+        feedback = self._feedback_cache.get(key)
+        if feedback is None:
+            feedback = bitmask_to_messages(_run_rules(lm, rules), rules)
+            self._feedback_cache[key] = feedback
         return feedback
@@ -1,3 +1,5 @@
+import binascii
+
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -5,6 +7,17 @@ import numpy as np
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
+# Wider frames are downscaled before inference; the pose model's input is far smaller anyway
+MAX_FRAME_WIDTH = 640
+
+# cv2.imdecode flag for each decode reduction factor (width and height divided by the key)
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
 
 class PoseDetector:
     """MediaPipe-based pose detection"""
@@ -17,6 +30,8 @@ class PoseDetector:
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
         )
+        # RGB frame buffer reused across frames; reallocated only when the frame size changes
+        self._rgb_buffer: np.ndarray | None = None
 
     def detect(self, image: np.ndarray) -> dict | None:
         """
@@ -26,11 +41,14 @@ class PoseDetector:
             image: RGB image as numpy array
 
         Returns:
-            Dictionary with landmarks or None if no pose detected
+            Dictionary with landmarks (list of dicts), landmarks_array ((33, 4) float32
+            array of x, y, z, visibility) and world_landmarks, or None if no pose detected
         """
         # Convert BGR to RGB if needed
         if len(image.shape) == 3 and image.shape[2] == 3:
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            if self._rgb_buffer is None or self._rgb_buffer.shape != image.shape:
+                self._rgb_buffer = np.empty(image.shape, dtype=image.dtype)
+            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
         else:
             image_rgb = image
 
@@ -40,19 +58,24 @@ class PoseDetector:
         if not results.pose_landmarks:
             return None
 
-        # Extract landmarks
+        # Extract landmarks, both as dictionaries and as one contiguous array
+        pose_landmarks = results.pose_landmarks.landmark
         landmarks = []
-        for landmark in results.pose_landmarks.landmark:
-            landmarks.append(
-                {
-                    "x": landmark.x,
-                    "y": landmark.y,
-                    "z": landmark.z,
-                    "visibility": landmark.visibility,
-                }
-            )
-
-        return {"landmarks": landmarks, "world_landmarks": self._extract_world_landmarks(results)}
+        landmarks_array = np.empty((len(pose_landmarks), 4), dtype=np.float32)
+        for i, landmark in enumerate(pose_landmarks):
+            x, y, z, visibility = landmark.x, landmark.y, landmark.z, landmark.visibility
+            landmarks.append({"x": x, "y": y, "z": z, "visibility": visibility})
+            landmarks_array[i] = (x, y, z, visibility)
+
+        return {
+            "landmarks": landmarks,
+            "landmarks_array": landmarks_array,
+            "world_landmarks": self._extract_world_landmarks(results),
+        }
+
+    def warm_up(self, width: int = 640, height: int = 480):
+        """Run one inference on a blank frame so the first real frame doesn't pay model setup"""
+        self.detect(np.zeros((height, width, 3), dtype=np.uint8))
 
     def _extract_world_landmarks(self, results) -> list[dict] | None:
         """Extract world landmarks (3D coordinates in meters)"""
@@ -77,25 +100,78 @@ class PoseDetector:
         self.pose.close()
 
 
-def decode_base64_image(base64_string: str) -> np.ndarray:
+def downscale_frame(image: np.ndarray, max_width: int = MAX_FRAME_WIDTH) -> np.ndarray:
     """
-    Decode base64 string to numpy array image.
+    Shrink an image to at most max_width pixels wide, keeping its aspect ratio.
+
+    Landmarks are normalized to the frame, so downscaling doesn't change their coordinates.
 
     Args:
-        base64_string: Base64 encoded image string
+        image: Image as numpy array
+        max_width: Maximum width in pixels
 
     Returns:
-        Numpy array image in BGR format
+        The image itself if it's narrow enough, otherwise an area-interpolated copy
+    """
+    height, width = image.shape[:2]
+    if width <= max_width:
+        return image
+    new_height = max(1, round(height * max_width / width))
+    return cv2.resize(image, (max_width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def decode_base64(base64_string: str) -> bytes:
+    """Decode a base64 string to the raw encoded image bytes"""
+    # binascii accepts the ASCII str directly, skipping base64.b64decode's str -> bytes copy
+    return binascii.a2b_base64(base64_string)
+
+
+def decode_scale(width: int, max_width: int = MAX_FRAME_WIDTH) -> int:
+    """
+    Largest reduced-decode factor that keeps a frame at least max_width pixels wide.
+
+    Args:
+        width: Full width of the encoded frame in pixels
+        max_width: Width the frame is downscaled to before detection
+
+    Returns:
+        One of the DECODE_FLAGS factors (1 means decode at full size)
     """
-    import base64
+    scale = 1
+    for factor in DECODE_FLAGS:
+        if width // factor >= max_width:
+            scale = factor
+    return scale
+
 
-    # Decode base64
-    img_data = base64.b64decode(base64_string)
+def decode_image(img_data: bytes, scale: int = 1) -> np.ndarray:
+    """
+    Decode encoded image bytes (e.g. JPEG) to a numpy array image.
 
+    Args:
+        img_data: Encoded image bytes
+        scale: Reduce width and height by this factor while decoding (1, 2, 4 or 8)
+
+    Returns:
+        Numpy array image in BGR format, or None if the data can't be decoded
+    """
     # Convert to numpy array
     nparr = np.frombuffer(img_data, np.uint8)
 
-    # Decode image
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    # Decode image; JPEG reduced modes scale in the DCT domain, cheaper than decode-then-resize
+    img = cv2.imdecode(nparr, DECODE_FLAGS[scale])
 
     return img
+
+
+def decode_base64_image(base64_string: str) -> np.ndarray:
+    """
+    Decode base64 string to numpy array image.
+
+    Args:
+        base64_string: Base64 encoded image string
+
+    Returns:
+        Numpy array image in BGR format
+    """
+    return decode_image(decode_base64(base64_string))
@@ -1,4 +1,56 @@
-from .utils.geometry import calculate_angle
+import numpy as np
+
+from .utils.geometry import calculate_angles
+from .utils.landmarks import (
+    LEFT_ANKLE,
+    LEFT_ELBOW,
+    LEFT_HIP,
+    LEFT_KNEE,
+    LEFT_SHOULDER,
+    LEFT_WRIST,
+    NUM_LANDMARKS,
+    RIGHT_ANKLE,
+    RIGHT_ELBOW,
+    RIGHT_HIP,
+    RIGHT_KNEE,
+    RIGHT_SHOULDER,
+    RIGHT_WRIST,
+    X,
+    Y,
+    Z,
+    landmarks_to_array,
+)
+from .utils.lru import LRUCache
+
+# Held poses repeat near-identical frames: recognition results are memoized on the
+# joint angles rounded to whole degrees
+RECOGNITION_CACHE_SIZE = 256
+
+# Key joints compared against reference poses, with their (first, vertex, last) landmarks
+JOINT_NAMES = (
+    "left_elbow",
+    "right_elbow",
+    "left_knee",
+    "right_knee",
+    "left_hip",
+    "right_hip",
+    "left_shoulder",
+    "right_shoulder",
+)
+JOINT_INDEX = {joint: col for col, joint in enumerate(JOINT_NAMES)}
+JOINT_TRIPLETS = np.array(
+    [
+        [LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST],  # shoulder, elbow, wrist
+        [RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST],
+        [LEFT_HIP, LEFT_KNEE, LEFT_ANKLE],  # hip, knee, ankle
+        [RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE],
+        [LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE],  # shoulder, hip, knee
+        [RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE],
+        [LEFT_ELBOW, LEFT_SHOULDER, LEFT_HIP],  # elbow, shoulder, hip
+        [RIGHT_ELBOW, RIGHT_SHOULDER, RIGHT_HIP],
+    ],
+    dtype=np.intp,
+)
 
 # Pose orientation requirements - which view each pose needs
 POSE_ORIENTATIONS: dict[str, list[str]] = {
@@ -27,7 +79,40 @@ POSE_ORIENTATIONS: dict[str, list[str]] = {
 }
 
 
-def detect_orientation(landmarks: list[dict]) -> str:
+# Orientation codes returned by orientation_codes, indexing ORIENTATIONS
+FRONT, SIDE_LEFT, SIDE_RIGHT, SUPINE = range(4)
+ORIENTATIONS = ("front", "side_left", "side_right", "supine")
+
+
+def orientation_codes(landmarks: np.ndarray) -> np.ndarray:
+    """
+    Detect orientation codes for one frame or a batch of frames.
+
+    Branch-free version of detect_orientation; codes index ORIENTATIONS.
+
+    Args:
+        landmarks: Landmark array of shape (..., 33, 3) or (..., 33, 4)
+
+    Returns:
+        Integer array of orientation codes with the leading shape of landmarks
+    """
+    left_shoulder = landmarks[..., LEFT_SHOULDER, :]
+    right_shoulder = landmarks[..., RIGHT_SHOULDER, :]
+
+    # Supine (lying down): hips higher than shoulders in y
+    avg_shoulder_y = (left_shoulder[..., Y] + right_shoulder[..., Y]) / 2
+    avg_hip_y = (landmarks[..., LEFT_HIP, Y] + landmarks[..., RIGHT_HIP, Y]) / 2
+    supine = avg_hip_y < avg_shoulder_y - 0.15
+
+    # Side view: shoulders appear close together horizontally; positive z-depth
+    # difference means the left shoulder is closer to the camera
+    side = np.abs(left_shoulder[..., X] - right_shoulder[..., X]) < 0.15
+    side_code = np.where(left_shoulder[..., Z] - right_shoulder[..., Z] > 0, SIDE_LEFT, SIDE_RIGHT)
+
+    return np.where(supine, SUPINE, np.where(side, side_code, FRONT))
+
+
+def detect_orientation(landmarks: list[dict] | np.ndarray) -> str:
     """
     Detect user's orientation relative to camera.
 
@@ -35,237 +120,240 @@ def detect_orientation(landmarks: list[dict]) -> str:
     to determine if user is facing the camera or sideways.
 
     Args:
-        landmarks: List of 33 MediaPipe landmarks with x, y, z, visibility
+        landmarks: 33 MediaPipe landmarks with x, y, z, visibility, as dictionaries or an array
 
     Returns:
         'front', 'side_left', 'side_right', or 'supine'
     """
-    if not landmarks or len(landmarks) < 33:
+    if landmarks is None or len(landmarks) < NUM_LANDMARKS:
         return "front"
 
-    left_shoulder = landmarks[11]
-    right_shoulder = landmarks[12]
-    left_hip = landmarks[23]
-    right_hip = landmarks[24]
-
-    # Calculate shoulder width (x-distance between shoulders)
-    shoulder_width = abs(left_shoulder["x"] - right_shoulder["x"])
-
-    # Calculate shoulder depth difference (z-distance)
-    # Positive means left shoulder is closer to camera
-    shoulder_depth_diff = left_shoulder["z"] - right_shoulder["z"]
-
-    # Check if supine (lying down) - hips higher than shoulders in y
-    avg_shoulder_y = (left_shoulder["y"] + right_shoulder["y"]) / 2
-    avg_hip_y = (left_hip["y"] + right_hip["y"]) / 2
-    if avg_hip_y < avg_shoulder_y - 0.15:
-        return "supine"
-
-    # Side view: shoulders appear close together horizontally
-    # When facing sideways, shoulder width is very small
-    if shoulder_width < 0.15:
-        # Use z-depth to determine which side is facing camera
-        return "side_left" if shoulder_depth_diff > 0 else "side_right"
+    return ORIENTATIONS[int(orientation_codes(landmarks_to_array(landmarks)))]
+
+
+# Define reference poses with key angle configurations
+REFERENCE_POSES: dict[str, dict] = {
+    "Mountain Pose": {
+        "angles": {
+            "left_elbow": 180,
+            "right_elbow": 180,
+            "left_knee": 180,
+            "right_knee": 180,
+            "left_hip": 180,
+            "right_hip": 180,
+        },
+        "tolerance": 20,
+    },
+    "Warrior II Left": {
+        "angles": {
+            "left_knee": 90,  # Front leg bent
+            "right_knee": 180,  # Back leg straight
+            "left_shoulder": 90,
+            "right_shoulder": 90,
+        },
+        "tolerance": 25,
+    },
+    "Warrior II Right": {
+        "angles": {
+            "left_knee": 180,  # Back leg straight
+            "right_knee": 90,  # Front leg bent
+            "left_shoulder": 90,
+            "right_shoulder": 90,
+        },
+        "tolerance": 25,
+    },
+    "Tree Pose Left": {
+        "angles": {
+            "left_knee": 180,  # Standing leg straight
+            "right_knee": 90,  # Raised leg bent
+            "left_hip": 180,
+            "right_hip": 45,
+        },
+        "tolerance": 25,
+    },
+    "Tree Pose Right": {
+        "angles": {
+            "left_knee": 90,  # Raised leg bent
+            "right_knee": 180,  # Standing leg straight
+            "left_hip": 45,
+            "right_hip": 180,
+        },
+        "tolerance": 25,
+    },
+    "Downward Dog": {
+        "angles": {
+            "left_hip": 45,
+            "right_hip": 45,
+            "left_knee": 180,
+            "right_knee": 180,
+            "left_shoulder": 180,
+            "right_shoulder": 180,
+        },
+        "tolerance": 25,
+    },
+    "Plank": {
+        "angles": {
+            "left_elbow": 180,
+            "right_elbow": 180,
+            "left_hip": 180,
+            "right_hip": 180,
+            "left_knee": 180,
+            "right_knee": 180,
+        },
+        "tolerance": 15,
+    },
+    "Supine Bound Angle": {
+        "angles": {"left_knee": 55, "right_knee": 55, "left_hip": 55, "right_hip": 55},
+        "tolerance": 20,
+    },
+    "Hug the Knees": {
+        "angles": {"left_knee": 50, "right_knee": 50, "left_hip": 50, "right_hip": 50},
+        "tolerance": 20,
+    },
+    "Easy Seat": {
+        "angles": {"left_knee": 55, "right_knee": 55, "left_hip": 85, "right_hip": 85},
+        "tolerance": 30,
+    },
+    "Seated Hands Behind Back Stretch": {
+        "angles": {
+            "left_elbow": 165,
+            "right_elbow": 165,
+            "left_shoulder": 35,
+            "right_shoulder": 35,
+        },
+        "tolerance": 20,
+    },
+    "Gomukasana Legs Fold": {
+        "angles": {"left_knee": 90, "right_knee": 90, "left_hip": 85, "right_hip": 85},
+        "tolerance": 20,
+    },
+    "Janu Sirsasana Twist Left": {
+        "angles": {
+            "left_knee": 180,  # Extended leg
+            "right_knee": 90,  # Bent leg
+            "left_hip": 90,
+            "right_hip": 90,
+        },
+        "tolerance": 25,
+    },
+    "Janu Sirsasana Twist Right": {
+        "angles": {
+            "left_knee": 90,  # Bent leg
+            "right_knee": 180,  # Extended leg
+            "left_hip": 90,
+            "right_hip": 90,
+        },
+        "tolerance": 25,
+    },
+    "Janu Sirsasana Revolved Left": {
+        "angles": {
+            "left_knee": 180,  # Extended leg
+            "right_knee": 90,  # Bent leg
+            "left_hip": 70,
+            "right_hip": 90,
+        },
+        "tolerance": 25,
+    },
+    "Janu Sirsasana Revolved Right": {
+        "angles": {
+            "left_knee": 90,  # Bent leg
+            "right_knee": 180,  # Extended leg
+            "left_hip": 90,
+            "right_hip": 70,
+        },
+        "tolerance": 25,
+    },
+    "Reverse Table Top": {
+        "angles": {
+            "left_elbow": 180,
+            "right_elbow": 180,
+            "left_hip": 90,
+            "right_hip": 90,
+            "left_shoulder": 90,
+            "right_shoulder": 90,
+        },
+        "tolerance": 20,
+    },
+    "Supine Bent Knees": {
+        "angles": {"left_knee": 90, "right_knee": 90, "left_hip": 90, "right_hip": 90},
+        "tolerance": 20,
+    },
+}
 
-    return "front"
+# Dense view of REFERENCE_POSES for scoring every pose at once: one row per pose,
+# one column per JOINT_NAMES entry, masked where the pose doesn't constrain a joint
+REFERENCE_POSE_NAMES: list[str] = list(REFERENCE_POSES)
+REFERENCE_POSE_INDEX: dict[str, int] = {name: row for row, name in enumerate(REFERENCE_POSE_NAMES)}
+REFERENCE_ANGLES = np.zeros((len(REFERENCE_POSE_NAMES), len(JOINT_NAMES)), dtype=np.float32)
+REFERENCE_MASK = np.zeros(REFERENCE_ANGLES.shape, dtype=bool)
+for _row, _config in enumerate(REFERENCE_POSES.values()):
+    for _joint, _angle in _config["angles"].items():
+        REFERENCE_ANGLES[_row, JOINT_INDEX[_joint]] = _angle
+        REFERENCE_MASK[_row, JOINT_INDEX[_joint]] = True
+REFERENCE_TOLERANCES = np.array(
+    [config["tolerance"] for config in REFERENCE_POSES.values()], dtype=np.float32
+)
+
+REFERENCE_ANGLES.setflags(write=False)
+REFERENCE_MASK.setflags(write=False)
+REFERENCE_TOLERANCES.setflags(write=False)
 
 
 class YogaPoseRecognizer:
     """Recognize yoga poses from detected landmarks"""
 
     def __init__(self):
-        # Define reference poses with key angle configurations
-        self.reference_poses = {
-            "Mountain Pose": {
-                "angles": {
-                    "left_elbow": 180,
-                    "right_elbow": 180,
-                    "left_knee": 180,
-                    "right_knee": 180,
-                    "left_hip": 180,
-                    "right_hip": 180,
-                },
-                "tolerance": 20,
-            },
-            "Warrior II Left": {
-                "angles": {
-                    "left_knee": 90,  # Front leg bent
-                    "right_knee": 180,  # Back leg straight
-                    "left_shoulder": 90,
-                    "right_shoulder": 90,
-                },
-                "tolerance": 25,
-            },
-            "Warrior II Right": {
-                "angles": {
-                    "left_knee": 180,  # Back leg straight
-                    "right_knee": 90,  # Front leg bent
-                    "left_shoulder": 90,
-                    "right_shoulder": 90,
-                },
-                "tolerance": 25,
-            },
-            "Tree Pose Left": {
-                "angles": {
-                    "left_knee": 180,  # Standing leg straight
-                    "right_knee": 90,  # Raised leg bent
-                    "left_hip": 180,
-                    "right_hip": 45,
-                },
-                "tolerance": 25,
-            },
-            "Tree Pose Right": {
-                "angles": {
-                    "left_knee": 90,  # Raised leg bent
-                    "right_knee": 180,  # Standing leg straight
-                    "left_hip": 45,
-                    "right_hip": 180,
-                },
-                "tolerance": 25,
-            },
-            "Downward Dog": {
-                "angles": {
-                    "left_hip": 45,
-                    "right_hip": 45,
-                    "left_knee": 180,
-                    "right_knee": 180,
-                    "left_shoulder": 180,
-                    "right_shoulder": 180,
-                },
-                "tolerance": 25,
-            },
-            "Plank": {
-                "angles": {
-                    "left_elbow": 180,
-                    "right_elbow": 180,
-                    "left_hip": 180,
-                    "right_hip": 180,
-                    "left_knee": 180,
-                    "right_knee": 180,
-                },
-                "tolerance": 15,
-            },
-            "Supine Bound Angle": {
-                "angles": {"left_knee": 55, "right_knee": 55, "left_hip": 55, "right_hip": 55},
-                "tolerance": 20,
-            },
-            "Hug the Knees": {
-                "angles": {"left_knee": 50, "right_knee": 50, "left_hip": 50, "right_hip": 50},
-                "tolerance": 20,
-            },
-            "Easy Seat": {
-                "angles": {"left_knee": 55, "right_knee": 55, "left_hip": 85, "right_hip": 85},
-                "tolerance": 30,
-            },
-            "Seated Hands Behind Back Stretch": {
-                "angles": {
-                    "left_elbow": 165,
-                    "right_elbow": 165,
-                    "left_shoulder": 35,
-                    "right_shoulder": 35,
-                },
-                "tolerance": 20,
-            },
-            "Gomukasana Legs Fold": {
-                "angles": {"left_knee": 90, "right_knee": 90, "left_hip": 85, "right_hip": 85},
-                "tolerance": 20,
-            },
-            "Janu Sirsasana Twist Left": {
-                "angles": {
-                    "left_knee": 180,  # Extended leg
-                    "right_knee": 90,  # Bent leg
-                    "left_hip": 90,
-                    "right_hip": 90,
-                },
-                "tolerance": 25,
-            },
-            "Janu Sirsasana Twist Right": {
-                "angles": {
-                    "left_knee": 90,  # Bent leg
-                    "right_knee": 180,  # Extended leg
-                    "left_hip": 90,
-                    "right_hip": 90,
-                },
-                "tolerance": 25,
-            },
-            "Janu Sirsasana Revolved Left": {
-                "angles": {
-                    "left_knee": 180,  # Extended leg
-                    "right_knee": 90,  # Bent leg
-                    "left_hip": 70,
-                    "right_hip": 90,
-                },
-                "tolerance": 25,
-            },
-            "Janu Sirsasana Revolved Right": {
-                "angles": {
-                    "left_knee": 90,  # Bent leg
-                    "right_knee": 180,  # Extended leg
-                    "left_hip": 90,
-                    "right_hip": 70,
-                },
-                "tolerance": 25,
-            },
-            "Reverse Table Top": {
-                "angles": {
-                    "left_elbow": 180,
-                    "right_elbow": 180,
-                    "left_hip": 90,
-                    "right_hip": 90,
-                    "left_shoulder": 90,
-                    "right_shoulder": 90,
-                },
-                "tolerance": 20,
-            },
-            "Supine Bent Knees": {
-                "angles": {"left_knee": 90, "right_knee": 90, "left_hip": 90, "right_hip": 90},
-                "tolerance": 20,
-            },
-        }
-
-    def recognize(self, landmarks: list[dict]) -> tuple[str, float]:
+        # Reference data is built once at import and shared by every recognizer
+        self.reference_poses = REFERENCE_POSES
+        self.pose_names = REFERENCE_POSE_NAMES
+        self.pose_index = REFERENCE_POSE_INDEX
+        self.ref_angles = REFERENCE_ANGLES
+        self.ref_mask = REFERENCE_MASK
+        self.tolerances = REFERENCE_TOLERANCES
+        self._recognition_cache: LRUCache = LRUCache(RECOGNITION_CACHE_SIZE)
+
+    def recognize(self, landmarks: list[dict] | np.ndarray) -> tuple[str, float]:
         """
         Recognize the yoga pose from landmarks.
 
         Args:
-            landmarks: List of landmark dictionaries with x, y, z, visibility
+            landmarks: Landmark dictionaries with x, y, z, visibility, or a landmark array
 
         Returns:
             Tuple of (pose_name, confidence)
         """
-        if not landmarks or len(landmarks) < 33:
+        if landmarks is None or len(landmarks) < NUM_LANDMARKS:
             return "Unknown", 0.0
 
-        # Calculate current pose angles
-        current_angles = self._calculate_angles(landmarks)
-
-        # Compare with reference poses
-        best_match = "Unknown"
-        best_confidence = 0.0
-
-        for pose_name, config in self.reference_poses.items():
-            confidence = self._calculate_similarity(
-                current_angles, config["angles"], config["tolerance"]
-            )
-
-            if confidence > best_confidence:
-                best_confidence = confidence
-                best_match = pose_name
+        current = self._angle_vector(landmarks)
+        key = np.round(current).astype(np.uint8).tobytes()
+        result = self._recognition_cache.get(key)
+        if result is None:
+            result = self._rank(current)
+            self._recognition_cache[key] = result
+        return result
+
+    def _rank(self, current: np.ndarray) -> tuple[str, float]:
+        """Best matching pose for the given joint angles, or Unknown below the threshold"""
+        # Score all reference poses against the current angles at once
+        scores = self._score_all(current)
+        best = int(scores.argmax())
+        best_confidence = float(scores[best])
 
         # Only return pose if confidence is above threshold
         if best_confidence < 0.6:
             return "Unknown", best_confidence
 
-        return best_match, best_confidence
+        return self.pose_names[best], best_confidence
 
     def evaluate_target_pose(
-        self, landmarks: list[dict], target_pose: str
+        self, landmarks: list[dict] | np.ndarray, target_pose: str
     ) -> tuple[float | None, dict, str, bool]:
         """
         Evaluate how well current pose matches a specific target pose.
 
         Args:
-            landmarks: List of landmark dictionaries with x, y, z, visibility
+            landmarks: Landmark dictionaries with x, y, z, visibility, or a landmark array
             target_pose: Name of the target pose to evaluate against
 
         Returns:
@@ -275,11 +363,14 @@ class YogaPoseRecognizer:
             - orientation: Current user orientation ('front', 'side_left', etc.)
             - orientation_valid: Whether user is in correct orientation for pose
         """
-        if not landmarks or len(landmarks) < 33:
+        if landmarks is None or len(landmarks) < NUM_LANDMARKS:
             return 0.0, {}, "front", True
 
+        # Convert once; orientation and angles both read the same array
+        lm = landmarks_to_array(landmarks)
+
         # Detect current orientation
-        orientation = detect_orientation(landmarks)
+        orientation = detect_orientation(lm)
 
         # Check if orientation is valid for target pose
         orientation_valid = True
@@ -291,25 +382,25 @@ class YogaPoseRecognizer:
         if not orientation_valid:
             return None, {}, orientation, False
 
-        if target_pose not in self.reference_poses:
+        row = self.pose_index.get(target_pose)
+        if row is None:
             return 0.0, {}, orientation, True
 
-        # Calculate current pose angles
-        current_angles = self._calculate_angles(landmarks)
+        # Calculate current pose angles and overall confidence for the target row
+        current = self._angle_vector(lm)
+        confidence = float(self._score_all(current, row))
 
         # Get reference pose configuration
         reference_config = self.reference_poses[target_pose]
         reference_angles = reference_config["angles"]
         tolerance = reference_config["tolerance"]
 
-        # Calculate overall confidence
-        confidence = self._calculate_similarity(current_angles, reference_angles, tolerance)
-
         # Build detailed angle breakdown
+        current_angles = current.tolist()
         angle_breakdown = {}
         for joint, ref_angle in reference_angles.items():
-            if joint in current_angles:
-                current_angle = current_angles[joint]
+            if joint in JOINT_INDEX:
+                current_angle = current_angles[JOINT_INDEX[joint]]
                 diff = abs(current_angle - ref_angle)
 
                 # Determine status based on difference
@@ -329,51 +420,32 @@ class YogaPoseRecognizer:
 
         return confidence, angle_breakdown, orientation, orientation_valid
 
-    def _calculate_angles(self, landmarks: list[dict]) -> dict[str, float]:
-        """Calculate key joint angles from landmarks"""
-        angles = {}
-
-        # Left elbow angle
-        angles["left_elbow"] = calculate_angle(
-            landmarks[11],
-            landmarks[13],
-            landmarks[15],  # shoulder, elbow, wrist
-        )
-
-        # Right elbow angle
-        angles["right_elbow"] = calculate_angle(landmarks[12], landmarks[14], landmarks[16])
-
-        # Left knee angle
-        angles["left_knee"] = calculate_angle(
-            landmarks[23],
-            landmarks[25],
-            landmarks[27],  # hip, knee, ankle
-        )
-
-        # Right knee angle
-        angles["right_knee"] = calculate_angle(landmarks[24], landmarks[26], landmarks[28])
-
-        # Left hip angle
-        angles["left_hip"] = calculate_angle(
-            landmarks[11],
-            landmarks[23],
-            landmarks[25],  # shoulder, hip, knee
-        )
-
-        # Right hip angle
-        angles["right_hip"] = calculate_angle(landmarks[12], landmarks[24], landmarks[26])
-
-        # Left shoulder angle
-        angles["left_shoulder"] = calculate_angle(
-            landmarks[13],
-            landmarks[11],
-            landmarks[23],  # elbow, shoulder, hip
-        )
-
-        # Right shoulder angle
-        angles["right_shoulder"] = calculate_angle(landmarks[14], landmarks[12], landmarks[24])
-
-        return angles
+    def _angle_vector(self, landmarks: list[dict] | np.ndarray) -> np.ndarray:
+        """Key joint angles as an array ordered like JOINT_NAMES"""
+        return calculate_angles(landmarks_to_array(landmarks), JOINT_TRIPLETS)
+
+    def _calculate_angles(self, landmarks: list[dict] | np.ndarray) -> dict[str, float]:
+        """Calculate key joint angles from landmark dictionaries or a landmark array"""
+        return dict(zip(JOINT_NAMES, self._angle_vector(landmarks).tolist(), strict=True))
+
+    def _score_all(self, current: np.ndarray, rows: int | slice = slice(None)) -> np.ndarray:
+        """
+        Similarity of the current joint angles to reference poses.
+
+        Same scoring as _calculate_similarity, vectorized over poses.
+
+        Args:
+            current: Joint angles ordered like JOINT_NAMES
+            rows: Pose row (see pose_index) or slice of rows to score; all poses by default
+
+        Returns:
+            Confidence score (0.0 to 1.0) per selected pose, ordered like pose_names
+        """
+        ref_angles = self.ref_angles[rows]
+        ref_mask = self.ref_mask[rows]
+        tolerances = self.tolerances[rows, None]
+        similarity = np.maximum(0.0, 1.0 - np.abs(current - ref_angles) / (tolerances * 2))
+        return np.where(ref_mask, similarity, 0.0).sum(axis=-1) / ref_mask.sum(axis=-1)
 
     def _calculate_similarity(
         self,
@@ -1,10 +1,11 @@
-import base64
 import json
-import re
+import logging
 
 from google import genai
 from google.genai import types
 
+logger = logging.getLogger(__name__)
+
 
 class GeminiPoseAnalyzer:
     """Analyze yoga poses using Gemini 2.0 Flash vision capabilities."""
@@ -15,13 +16,13 @@ class GeminiPoseAnalyzer:
         self.model = "gemini-2.0-flash"
 
     async def analyze_pose(
-        self, image_base64: str, target_pose: str, confidence: float, angle_breakdown: dict
+        self, image_bytes: bytes, target_pose: str, confidence: float, angle_breakdown: dict
     ) -> list[str]:
         """
         Analyze pose using Gemini Vision and return feedback.
 
         Args:
-            image_base64: Base64 encoded JPEG image
+            image_bytes: Encoded JPEG image bytes
             target_pose: Name of the target yoga pose
             confidence: Current match confidence (0.0 to 1.0)
             angle_breakdown: Dict with per-joint comparison details
@@ -46,12 +47,12 @@ Format: Return ONLY a JSON array of strings, e.g. ["Lift your arms higher", "Squ
 Do not include any other text outside the JSON array."""
 
         try:
-            # Create image part from base64 data
-            image_part = types.Part.from_bytes(
-                data=base64.b64decode(image_base64), mime_type="image/jpeg"
-            )
+            # Create image part from the already-decoded JPEG bytes
+            image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
 
-            print(f"[GEMINI] Calling API for pose: {target_pose} (confidence: {confidence:.0%})")
+            logger.debug(
+                "Calling Gemini for pose: %s (confidence: %.0f%%)", target_pose, confidence * 100
+            )
 
             # Use async client for non-blocking API call
             response = await self.client.aio.models.generate_content(
@@ -59,11 +60,11 @@ Do not include any other text outside the JSON array."""
             )
 
             feedback = self._parse_feedback(response.text)
-            print(f"[GEMINI] Response: {feedback}")
+            logger.debug("Gemini response: %s", feedback)
             return feedback
 
-        except Exception as e:
-            print(f"[GEMINI] API error: {e}")
+        except Exception:
+            logger.exception("Gemini API call failed")
             return []
 
     def _format_angle_breakdown(self, angle_breakdown: dict) -> str:
@@ -97,8 +98,8 @@ Do not include any other text outside the JSON array."""
 
             # Remove markdown code block if present
             if text.startswith("```"):
-                text = re.sub(r"^```(?:json)?\n?", "", text)
-                text = re.sub(r"\n?```$", "", text)
+                text = text[3:].removeprefix("json").removeprefix("\n")
+                text = text.removesuffix("```").removesuffix("\n")
 
             # Parse the JSON array
             feedback = json.loads(text)
@@ -109,5 +110,5 @@ Do not include any other text outside the JSON array."""
             return []
 
         except json.JSONDecodeError:
-            print(f"Failed to parse Gemini response: {response_text}")
+            logger.warning("Failed to parse Gemini response: %s", response_text)
             return []
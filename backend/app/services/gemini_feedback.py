@@ -0,0 +1,98 @@
+"""Per-client Gemini feedback, refreshed in the background so frames never wait on Gemini"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+GEMINI_CALL_INTERVAL = 3.0  # seconds between Gemini calls
+
+# Refreshes in progress; the event loop only keeps weak references to running tasks
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+@dataclass(slots=True)
+class GeminiCacheEntry:
+    """Last Gemini call and its feedback for one client"""
+
+    last_call: float = 0.0
+    feedback: list[str] | None = None
+    target_pose: str | None = None
+    # Held while a Gemini call is in flight, so a client never has two at once
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+async def request_feedback(
+    cache: GeminiCacheEntry,
+    analyzer,
+    image_bytes: bytes,
+    target_pose: str,
+    confidence: float,
+    angle_breakdown: dict,
+) -> list[str] | None:
+    """
+    Return a client's latest Gemini feedback, starting a background refresh when one is due.
+
+    A refresh is due every GEMINI_CALL_INTERVAL seconds, or as soon as the target pose
+    changes. It runs as its own task, so this returns without waiting for Gemini.
+
+    Args:
+        cache: The client's cache entry
+        analyzer: GeminiPoseAnalyzer used for the refresh
+        image_bytes: Encoded JPEG frame sent to Gemini
+        target_pose: Pose the client is evaluated against
+        confidence: Current match confidence (0.0 to 1.0)
+        angle_breakdown: Dict with per-joint comparison details
+
+    Returns:
+        Feedback from the latest finished call for target_pose, or None if there is none yet
+    """
+    # Monotonic clock: the call interval must not jump with wall-clock adjustments
+    current_time = time.monotonic()
+
+    # Within the interval for the same pose: serve cached feedback without further work
+    if cache.target_pose == target_pose and current_time - cache.last_call < GEMINI_CALL_INTERVAL:
+        return cache.feedback
+
+    # A call is already in flight; its feedback only applies to the pose it was made for
+    if cache.lock.locked():
+        return cache.feedback if cache.target_pose == target_pose else None
+
+    # Acquiring a free lock doesn't suspend, so it is held before the refresh is scheduled
+    await cache.lock.acquire()
+    if cache.target_pose != target_pose:
+        cache.feedback = None
+    # Update last_call BEFORE making the API call to prevent retry storms
+    cache.last_call = current_time
+    cache.target_pose = target_pose
+
+    task = asyncio.create_task(
+        _refresh(cache, analyzer, image_bytes, target_pose, confidence, angle_breakdown)
+    )
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+    return cache.feedback
+
+
+async def _refresh(
+    cache: GeminiCacheEntry,
+    analyzer,
+    image_bytes: bytes,
+    target_pose: str,
+    confidence: float,
+    angle_breakdown: dict,
+):
+    """Call Gemini and store its feedback in the cache entry, then release the entry's lock"""
+    try:
+        feedback = await analyzer.analyze_pose(
+            image_bytes, target_pose, confidence, angle_breakdown
+        )
+        if feedback:
+            cache.feedback = feedback
+    except Exception:
+        # Keep using cached feedback on error
+        logger.exception("Gemini call failed")
+    finally:
+        cache.lock.release()
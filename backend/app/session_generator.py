@@ -1,19 +1,37 @@
 """Session generation with smart duration scaling"""
 
 import uuid
+from functools import lru_cache
+
+import numpy as np
 
 from .body_parts import (
-    COOLDOWN_POSES,
-    POSE_METADATA,
-    WARMUP_POSES,
-    get_pose_pair,
+    CATEGORY_COOLDOWN,
+    CATEGORY_WARMUP,
+    DIFFICULTY_CODES,
+    POSE_BASE_DURATION,
+    POSE_CATEGORY,
+    POSE_DIFFICULTY,
+    POSE_INDEX,
+    POSE_NAMES,
+    POSE_PARTNER,
     get_poses_for_body_parts,
-    is_asymmetric_pose,
+    with_pose_pairs,
 )
 
+PAIN_BONUS = 30  # extra seconds for poses that target a pain area
+
+# Pose indices the flow ordering falls back on
+_MOUNTAIN_POSE = POSE_INDEX["Mountain Pose"]
+_EASY_SEAT = POSE_INDEX["Easy Seat"]
+_SUPINE_BENT_KNEES = POSE_INDEX["Supine Bent Knees"]
+
 
 def generate_session(
-    pain_areas: list[str], improvement_areas: list[str], duration_minutes: int
+    pain_areas: list[str],
+    improvement_areas: list[str],
+    duration_minutes: int,
+    max_difficulty: str | None = None,
 ) -> dict:
     """
     Generate a personalized yoga session
@@ -22,6 +40,7 @@ def generate_session(
         pain_areas: Body parts experiencing pain
         improvement_areas: Body parts to improve/strengthen
         duration_minutes: Total session duration in minutes
+        max_difficulty: Hardest difficulty to include ("easy", "medium" or "hard"), or None for all
 
     Returns:
         Session dictionary with poses and durations
@@ -30,106 +49,96 @@ def generate_session(
     pain_poses = get_poses_for_body_parts(pain_areas)
     improvement_poses = get_poses_for_body_parts(improvement_areas)
 
-    # Combine and deduplicate
-    selected_poses = []
+    # Combine and deduplicate; the first tag wins and insertion order is the selection order
     pose_tags = {}  # Track if pose targets pain or improvement
 
     for pose in pain_poses:
-        if pose not in selected_poses:
-            selected_poses.append(pose)
-            pose_tags[pose] = "pain"
+        pose_tags.setdefault(pose, "pain")
 
     for pose in improvement_poses:
-        if pose not in selected_poses:
-            selected_poses.append(pose)
-            pose_tags[pose] = "improvement"
+        pose_tags.setdefault(pose, "improvement")
+
+    selected_poses = _up_to_difficulty(list(pose_tags), max_difficulty)
 
     # If no poses selected, use a balanced default sequence
     if not selected_poses:
-        selected_poses = [
-            "Mountain Pose",
-            "Downward Dog",
-            "Warrior II Left",
-            "Warrior II Right",
-            "Tree Pose Left",
-            "Tree Pose Right",
-            "Easy Seat",
-            "Supine Bent Knees",
-        ]
+        selected_poses = _up_to_difficulty(
+            [
+                "Mountain Pose",
+                "Downward Dog",
+                "Warrior II Left",
+                "Warrior II Right",
+                "Tree Pose Left",
+                "Tree Pose Right",
+                "Easy Seat",
+                "Supine Bent Knees",
+            ],
+            max_difficulty,
+        )
         pose_tags = dict.fromkeys(selected_poses, "general")
 
+    # Work on pose indices from here on; names come back only in the session object
+    index_tags = {POSE_INDEX[pose]: tag for pose, tag in pose_tags.items()}
+
     # 2. Auto-pair asymmetrical poses
     final_poses = []
     added_poses = set()
 
-    for pose in selected_poses:
+    for pose in (POSE_INDEX[name] for name in selected_poses):
         if pose in added_poses:
             continue
 
-        if is_asymmetric_pose(pose):
-            pair = get_pose_pair(pose)
-            if pair:
-                final_poses.append(pose)
-                final_poses.append(pair)
-                added_poses.add(pose)
-                added_poses.add(pair)
-                # Copy tag to paired pose
-                if pair not in pose_tags:
-                    pose_tags[pair] = pose_tags[pose]
-        else:
-            final_poses.append(pose)
-            added_poses.add(pose)
-
-    # 3. Order poses: warmup → peak → cooldown
-    ordered_poses = _order_poses(final_poses)
+        final_poses.append(pose)
+        added_poses.add(pose)
 
-    # 4. Calculate initial durations
-    pose_durations = []
-    total_base_duration = 0
+        pair = int(POSE_PARTNER[pose])
+        if pair >= 0:
+            final_poses.append(pair)
+            added_poses.add(pair)
+            # Copy tag to paired pose
+            index_tags.setdefault(pair, index_tags[pose])
 
-    for pose in ordered_poses:
-        base_duration = POSE_METADATA[pose]["base_duration"]
+    # 3. Order poses: warmup → peak → cooldown
+    ordered_indices = _ordered_pose_indices(tuple(final_poses))
+    ordered_poses = [POSE_NAMES[i] for i in ordered_indices]
 
-        # Add pain bonus (+30 seconds)
-        is_pain_target = pose_tags.get(pose) == "pain"
-        duration = base_duration + 30 if is_pain_target else base_duration
+    # 4. Calculate initial durations from the base-duration array
+    tags = [index_tags.get(i) for i in ordered_indices]
+    is_pain_target = [tag == "pain" for tag in tags]
+    pose_indices = np.array(ordered_indices, dtype=np.intp)
 
-        pose_durations.append(
-            {
-                "name": pose,
-                "duration": duration,
-                "is_pain_target": is_pain_target,
-                "is_improvement_target": pose_tags.get(pose) == "improvement",
-            }
-        )
-        total_base_duration += duration
+    # Add pain bonus
+    durations = POSE_BASE_DURATION[pose_indices].astype(np.int64) + PAIN_BONUS * np.array(
+        is_pain_target, dtype=bool
+    )
+    total_base_duration = int(durations.sum())
 
     # 5. Scale durations to fit session time
     target_duration = duration_minutes * 60  # Convert to seconds
-    transition_time = (len(pose_durations) - 1) * 5  # 5 seconds between poses
+    transition_time = (len(ordered_poses) - 1) * 5  # 5 seconds between poses
     available_time = target_duration - transition_time
 
     if total_base_duration != available_time:
         scale_factor = available_time / total_base_duration
-
-        for pose_data in pose_durations:
-            pose_data["duration"] = int(pose_data["duration"] * scale_factor)
+        durations = (durations * scale_factor).astype(np.int64)
 
     # 6. Create session object
     session = {
         "id": str(uuid.uuid4()),
         "poses": [
             {
-                "pose_name": p["name"],
-                "duration": p["duration"],
+                "pose_name": pose,
+                "duration": duration,
                 "order": idx + 1,
-                "is_pain_target": p["is_pain_target"],
-                "is_improvement_target": p["is_improvement_target"],
+                "is_pain_target": pain,
+                "is_improvement_target": tag == "improvement",
             }
-            for idx, p in enumerate(pose_durations)
+            for idx, (pose, duration, pain, tag) in enumerate(
+                zip(ordered_poses, durations.tolist(), is_pain_target, tags, strict=True)
+            )
         ],
         "total_duration": duration_minutes,
-        "num_poses": len(pose_durations),
+        "num_poses": len(ordered_poses),
         "pain_areas": pain_areas,
         "improvement_areas": improvement_areas,
     }
@@ -137,74 +146,78 @@ def generate_session(
     return session
 
 
+def _up_to_difficulty(poses: list[str], max_difficulty: str | None) -> list[str]:
+    """Poses no harder than max_difficulty, in their original order"""
+    if max_difficulty is None:
+        return poses
+    indices = np.array([POSE_INDEX[pose] for pose in poses], dtype=np.intp)
+    keep = POSE_DIFFICULTY[indices] <= DIFFICULTY_CODES[max_difficulty]
+    return [pose for pose, kept in zip(poses, keep.tolist(), strict=True) if kept]
+
+
 def _order_poses(poses: list[str]) -> list[str]:
     """Order poses in a logical flow: warmup → peak → cooldown"""
+    ordered = _ordered_pose_indices(tuple(POSE_INDEX[pose] for pose in poses))
+    return [POSE_NAMES[i] for i in ordered]
+
+
+@lru_cache(maxsize=256)
+def _ordered_pose_indices(poses: tuple[int, ...]) -> tuple[int, ...]:
+    """Cached warmup → peak → cooldown ordering of a sequence of pose indices"""
+    categories = POSE_CATEGORY[np.array(poses, dtype=np.intp)]
     warmup = []
     peak = []
     cooldown = []
 
-    for pose in poses:
-        if pose in WARMUP_POSES:
+    for pose, category in zip(poses, categories.tolist(), strict=True):
+        if category == CATEGORY_WARMUP:
             warmup.append(pose)
-        elif pose in COOLDOWN_POSES:
+        elif category == CATEGORY_COOLDOWN:
             cooldown.append(pose)
         else:
             peak.append(pose)
 
     # Ensure at least one warmup and cooldown
     if not warmup and poses:
-        if "Mountain Pose" in poses:
-            warmup.append("Mountain Pose")
-            peak = [p for p in peak if p != "Mountain Pose"]
-        elif "Easy Seat" in poses:
-            warmup.append("Easy Seat")
-            peak = [p for p in peak if p != "Easy Seat"]
+        if _MOUNTAIN_POSE in poses:
+            warmup.append(_MOUNTAIN_POSE)
+            peak = [p for p in peak if p != _MOUNTAIN_POSE]
+        elif _EASY_SEAT in poses:
+            warmup.append(_EASY_SEAT)
+            peak = [p for p in peak if p != _EASY_SEAT]
 
     if not cooldown and poses:
-        if "Supine Bent Knees" in poses:
-            cooldown.append("Supine Bent Knees")
-            peak = [p for p in peak if p != "Supine Bent Knees"]
-        elif "Easy Seat" in poses and "Easy Seat" not in warmup:
-            cooldown.append("Easy Seat")
-            peak = [p for p in peak if p != "Easy Seat"]
+        if _SUPINE_BENT_KNEES in poses:
+            cooldown.append(_SUPINE_BENT_KNEES)
+            peak = [p for p in peak if p != _SUPINE_BENT_KNEES]
+        elif _EASY_SEAT in poses and _EASY_SEAT not in warmup:
+            cooldown.append(_EASY_SEAT)
+            peak = [p for p in peak if p != _EASY_SEAT]
 
-    return warmup + peak + cooldown
+    return (*warmup, *peak, *cooldown)
 
 
-def get_session_preview(pain_areas: list[str], improvement_areas: list[str]) -> dict:
+def get_session_preview(
+    pain_areas: list[str], improvement_areas: list[str], max_difficulty: str | None = None
+) -> dict:
     """
     Get a preview of how many poses would be in a session
 
     Args:
         pain_areas: Body parts experiencing pain
         improvement_areas: Body parts to improve
+        max_difficulty: Hardest difficulty to include ("easy", "medium" or "hard"), or None for all
 
     Returns:
         Preview with estimated pose count
     """
-    pain_poses = get_poses_for_body_parts(pain_areas)
-    improvement_poses = get_poses_for_body_parts(improvement_areas)
-
-    # Combine and deduplicate
-    all_poses = set(pain_poses + improvement_poses)
-
-    # Account for asymmetric pairs
-    estimated_poses = 0
-    counted = set()
+    pain_poses = _up_to_difficulty(get_poses_for_body_parts(pain_areas), max_difficulty)
+    improvement_poses = _up_to_difficulty(
+        get_poses_for_body_parts(improvement_areas), max_difficulty
+    )
 
-    for pose in all_poses:
-        if pose in counted:
-            continue
-
-        if is_asymmetric_pose(pose):
-            pair = get_pose_pair(pose)
-            estimated_poses += 2
-            counted.add(pose)
-            if pair:
-                counted.add(pair)
-        else:
-            estimated_poses += 1
-            counted.add(pose)
+    # Combine and deduplicate, counting both sides of every asymmetric pair
+    estimated_poses = len(with_pose_pairs(set(pain_poses).union(improvement_poses)))
 
     return {
         "estimated_poses": max(estimated_poses, 5),  # Minimum 5 poses
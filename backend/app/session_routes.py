@@ -1,15 +1,20 @@
 """FastAPI routes for yoga session management"""
 
+from typing import Literal
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from .body_parts import BODY_PART_POSES
 from .session_generator import generate_session, get_session_preview
+from .utils.lru import LRUCache
 
 router = APIRouter(prefix="/session", tags=["session"])
 
-# In-memory storage (replace with database in production)
-sessions_db: dict[str, dict] = {}
+# In-memory storage (replace with database in production), bounded so that
+# abandoned sessions are evicted least recently used first
+MAX_STORED_SESSIONS = 10_000
+sessions_db: LRUCache = LRUCache(MAX_STORED_SESSIONS)
 
 
 class SessionGenerateRequest(BaseModel):
@@ -18,6 +23,9 @@ class SessionGenerateRequest(BaseModel):
     pain_areas: list[str] = Field(default=[], description="Body parts experiencing pain")
     improvement_areas: list[str] = Field(default=[], description="Body parts to improve")
     duration_minutes: int = Field(ge=10, le=90, description="Session duration in minutes")
+    max_difficulty: Literal["easy", "medium", "hard"] | None = Field(
+        default=None, description="Hardest pose difficulty to include"
+    )
 
 
 class SessionPose(BaseModel):
@@ -72,6 +80,7 @@ async def create_session(request: SessionGenerateRequest):
             pain_areas=request.pain_areas,
             improvement_areas=request.improvement_areas,
             duration_minutes=request.duration_minutes,
+            max_difficulty=request.max_difficulty,
         )
 
         # Store session in memory
@@ -96,7 +105,9 @@ async def preview_session(request: SessionGenerateRequest):
     """
     try:
         preview = get_session_preview(
-            pain_areas=request.pain_areas, improvement_areas=request.improvement_areas
+            pain_areas=request.pain_areas,
+            improvement_areas=request.improvement_areas,
+            max_difficulty=request.max_difficulty,
         )
         return preview
 
@@ -115,10 +126,11 @@ async def get_session(session_id: str):
     Returns:
         Session details
     """
-    if session_id not in sessions_db:
+    session = sessions_db.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return sessions_db[session_id]
+    return session
 
 
 @router.post("/{session_id}/complete")
@@ -133,10 +145,10 @@ async def complete_session(session_id: str, request: SessionCompleteRequest):
     Returns:
         Success message
     """
-    if session_id not in sessions_db:
+    session = sessions_db.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session = sessions_db[session_id]
     session["completed"] = True
     session["completed_poses"] = request.completed_poses
     session["actual_duration"] = request.total_time
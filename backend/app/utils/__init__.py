@@ -1,5 +1,6 @@
 """Utility functions for the Alili backend"""
 
-from .geometry import calculate_angle
+from .landmarks import landmarks_to_array
+from .lru import LRUCache
 
-__all__ = ["calculate_angle"]
+__all__ = ["LRUCache", "landmarks_to_array"]
@@ -3,27 +3,40 @@
 import numpy as np
 
 
-def calculate_angle(
-    point1: dict[str, float],
-    point2: dict[str, float],
-    point3: dict[str, float],
-) -> float:
+def calculate_angle_array(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
     """
-    Calculate angle between three points.
+    Calculate angles at b for arrays of points, broadcasting over leading axes.
 
     Args:
-        point1: First landmark dictionary with 'x', 'y' keys
-        point2: Vertex landmark dictionary (the angle is measured here)
-        point3: Third landmark dictionary with 'x', 'y' keys
+        a: Points of shape (..., 2) or (..., 3); only x and y are used
+        b: Vertex points (the angle is measured here)
+        c: Third points
 
     Returns:
-        Angle in degrees (0-180)
+        Array of angles in degrees (0-180) with the broadcast leading shape;
+        90 where a point coincides with the vertex
     """
-    v1 = np.array([point1["x"] - point2["x"], point1["y"] - point2["y"]])
-    v2 = np.array([point3["x"] - point2["x"], point3["y"] - point2["y"]])
+    v1 = a[..., :2] - b[..., :2]
+    v2 = c[..., :2] - b[..., :2]
 
-    cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-    cos_angle = np.clip(cos_angle, -1.0, 1.0)
-    angle = np.arccos(cos_angle)
+    cross = v1[..., 0] * v2[..., 1] - v1[..., 1] * v2[..., 0]
+    dot = np.einsum("...i,...i->...", v1, v2)
 
-    return float(np.degrees(angle))
+    # Both vanish only for a zero-length limb, which the original acos kernel scored as 90
+    return np.where((cross == 0) & (dot == 0), 90.0, np.degrees(np.abs(np.arctan2(cross, dot))))
+
+
+def calculate_angles(points: np.ndarray, triplets: np.ndarray) -> np.ndarray:
+    """
+    Calculate several joint angles at once.
+
+    Args:
+        points: Landmark array of shape (N, 2) or wider; only x and y are used
+        triplets: Integer array of shape (M, 3) with (first, vertex, last) indices
+
+    Returns:
+        Array of M angles in degrees (0-180)
+    """
+    return calculate_angle_array(
+        points[triplets[:, 0]], points[triplets[:, 1]], points[triplets[:, 2]]
+    )
@@ -0,0 +1,34 @@
+"""Landmark array helpers"""
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# Columns of a landmark array
+X, Y, Z, VISIBILITY = range(4)
+
+# MediaPipe pose landmark indices
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+
+
+def landmarks_to_array(landmarks: list[dict] | np.ndarray) -> np.ndarray:
+    """
+    Convert landmarks to a float32 array with x, y, z, visibility columns.
+
+    Args:
+        landmarks: List of landmark dictionaries, or an existing landmark array
+
+    Returns:
+        Array of shape (N, 4); arrays are passed through as float32 without copying
+    """
+    if isinstance(landmarks, np.ndarray):
+        return np.asarray(landmarks, dtype=np.float32)
+    return np.array(
+        [(lm["x"], lm["y"], lm["z"], lm["visibility"]) for lm in landmarks], dtype=np.float32
+    )
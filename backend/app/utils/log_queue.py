@@ -0,0 +1,41 @@
+"""Logging that writes records from a background thread"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def setup_queue_logging(name: str, level: int = logging.INFO) -> QueueListener | None:
+    """
+    Route a logger's records through a queue so stream I/O stays off the event loop.
+
+    The calling thread only enqueues each record; a QueueListener thread formats and
+    writes it to stderr. Calling this again for the same logger is a no-op.
+
+    Args:
+        name: Logger to configure, e.g. the application package name
+        level: Minimum level to emit
+
+    Returns:
+        The started listener, or None if the logger was already configured
+    """
+    target = logging.getLogger(name)
+    if any(isinstance(handler, QueueHandler) for handler in target.handlers):
+        return None
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = QueueListener(log_queue, stream_handler)
+
+    target.addHandler(QueueHandler(log_queue))
+    target.setLevel(level)
+    # Records are written by the listener; don't also hand them to the root logger
+    target.propagate = False
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,29 @@
+"""Small bounded caches"""
+
+from collections import OrderedDict
+
+
+class LRUCache(OrderedDict):
+    """Mapping bounded to maxsize entries that evicts the least recently used one"""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Return the value for key (marking it recently used), or default"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
@@ -1,14 +1,25 @@
+import asyncio
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 
+import numpy as np
 import socketio
 from dotenv import load_dotenv
 
 from .pose_analysis import PoseQualityAnalyzer, get_orientation_feedback
-from .pose_detection import PoseDetector, decode_base64_image
+from .pose_detection import (
+    PoseDetector,
+    decode_base64,
+    decode_image,
+    decode_scale,
+    downscale_frame,
+)
 from .pose_recognition import POSE_ORIENTATIONS, YogaPoseRecognizer
 from .services.gemini_analyzer import GeminiPoseAnalyzer
+from .services.gemini_feedback import GeminiCacheEntry, request_feedback
 
 # Load environment variables
 load_dotenv()
@@ -16,12 +27,19 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Create Socket.IO server
+# Socket.IO's own logger reports every emit, i.e. every frame; our handlers log what matters
 sio = socketio.AsyncServer(
-    async_mode="asgi", cors_allowed_origins="*", logger=True, engineio_logger=False
+    async_mode="asgi", cors_allowed_origins="*", logger=False, engineio_logger=False
 )
 
-# Initialize pose detection components
+# Initialize pose detection components. MediaPipe tracks the pose across consecutive frames
+# and is not thread-safe, so all pose work runs on one dedicated worker thread.
+pose_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pose")
 pose_detector = PoseDetector(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+try:
+    pose_detector.warm_up()
+except Exception:
+    logger.exception("Pose detector warm-up failed")
 pose_recognizer = YogaPoseRecognizer()
 pose_analyzer = PoseQualityAnalyzer()
 
@@ -29,15 +47,47 @@ pose_analyzer = PoseQualityAnalyzer()
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 gemini_analyzer = GeminiPoseAnalyzer(gemini_api_key) if gemini_api_key else None
 
-# Gemini feedback cache per client (sid -> cached data)
-gemini_cache: dict[str, dict] = {}
-GEMINI_CALL_INTERVAL = 3.0  # seconds between Gemini calls
+FEEDBACK_THRESHOLD = 0.3  # minimum target-pose confidence for rule-based feedback
+
+
+class FrameAnalysis(NamedTuple):
+    """Recognition result and rule-based feedback for one frame"""
+
+    pose_name: str
+    confidence: float | None
+    angle_breakdown: dict
+    orientation: str
+    orientation_valid: bool
+    feedback: list[str] | tuple[str, ...]
+
+
+# Currently connected clients; per-client state is only written for these
+connected_clients: set[str] = set()
+
+# Gemini feedback cache per client, created on connect (sid -> cached data)
+gemini_cache: dict[str, GeminiCacheEntry] = {}
+
+# Reduced-decode factor per client, from the width of its previous frame (sid -> factor)
+decode_scales: dict[str, int] = {}
+
+# Clients with a frame being processed, and the newest frame each is waiting to process
+frames_in_flight: set[str] = set()
+pending_frames: dict[str, dict] = {}
+
+# Clients whose last emitted result was "no person detected", with its target pose
+no_pose_sent: dict[str, str | None] = {}
+
+# Last pose result emitted per client, keyed by the frame payload hash and target pose
+# (sid -> ((payload_hash, target_pose), result))
+last_results: dict[str, tuple[tuple[int, str | None], dict]] = {}
 
 
 @sio.event
 async def connect(sid, _environ):
     """Handle client connection"""
     logger.info("Client connected: %s", sid)
+    connected_clients.add(sid)
+    gemini_cache[sid] = GeminiCacheEntry()
     await sio.emit("connect_response", {"status": "connected"}, room=sid)
 
 
@@ -45,9 +95,17 @@ async def connect(sid, _environ):
 async def disconnect(sid):
     """Handle client disconnection"""
     logger.info("Client disconnected: %s", sid)
-    # Clean up Gemini cache for this client
-    if sid in gemini_cache:
-        del gemini_cache[sid]
+    connected_clients.discard(sid)
+    _forget_client(sid)
+
+
+def _forget_client(sid: str):
+    """Drop all per-client state for a disconnected client"""
+    gemini_cache.pop(sid, None)
+    decode_scales.pop(sid, None)
+    pending_frames.pop(sid, None)
+    no_pose_sent.pop(sid, None)
+    last_results.pop(sid, None)
 
 
 @sio.event
@@ -55,11 +113,33 @@ async def video_frame(sid, data):
     """
     Handle incoming video frames from client.
 
+    Frames are processed one at a time per client. A frame arriving while another is
+    being processed waits as the client's pending frame, replacing any older one.
+
     Args:
         sid: Socket ID
         data: Dictionary with 'image' key containing base64 encoded frame
               and optional 'target_pose' for evaluation mode
     """
+    if sid in frames_in_flight:
+        # Latest frame wins: stale frames are dropped instead of queueing up behind inference
+        pending_frames[sid] = data
+        return
+
+    frames_in_flight.add(sid)
+    try:
+        while data is not None and sid in connected_clients:
+            await _handle_frame(sid, data)
+            data = pending_frames.pop(sid, None)
+    finally:
+        frames_in_flight.discard(sid)
+        # A frame still in flight at disconnect may have written state after the cleanup
+        if sid not in connected_clients:
+            _forget_client(sid)
+
+
+async def _handle_frame(sid: str, data: dict):
+    """Process one video frame and emit its pose result to the client"""
     try:
         # Decode the image
         image_base64 = data.get("image")
@@ -70,18 +150,37 @@ async def video_frame(sid, data):
         # Get optional target pose for evaluation mode
         target_pose = data.get("target_pose")
 
-        # Decode base64 to image
-        image = decode_base64_image(image_base64)
+        # Throttled tabs can resend the same canvas frame: re-emit its result without MediaPipe
+        payload_key = (hash(image_base64), target_pose)
+        last = last_results.get(sid)
+        if last is not None and last[0] == payload_key:
+            await sio.emit(
+                "pose_result", {**last[1], "timestamp": time.time_ns() // 1_000_000}, room=sid
+            )
+            return
+        last_results.pop(sid, None)
+
+        # Decode base64 once: the JPEG bytes feed both OpenCV and Gemini
+        image_bytes = decode_base64(image_base64)
+
+        # Image decoding, MediaPipe and analysis are CPU-bound: run them off the event loop
+        loop = asyncio.get_running_loop()
+        processed = await loop.run_in_executor(
+            pose_executor, _process_frame, sid, image_bytes, target_pose
+        )
 
-        if image is None:
+        if processed is None:
             await sio.emit("error", {"message": "Failed to decode image"}, room=sid)
             return
 
-        # Detect pose
-        pose_result = pose_detector.detect(image)
-
-        if not pose_result or not pose_result["landmarks"]:
-            # No pose detected
+        pose_result, analysis = processed
+        if analysis is None:
+            # No pose detected; the client still shows this state if it was the last result sent
+            if sid in no_pose_sent and no_pose_sent[sid] == target_pose:
+                return
+            if sid not in connected_clients:
+                return
+            no_pose_sent[sid] = target_pose
             await sio.emit(
                 "pose_result",
                 {
@@ -89,44 +188,14 @@ async def video_frame(sid, data):
                     "poseName": target_pose if target_pose else "No Pose Detected",
                     "confidence": 0.0,
                     "feedback": ["No person detected in frame"],
-                    "timestamp": int(time.time() * 1000),
+                    "timestamp": time.time_ns() // 1_000_000,
                 },
                 room=sid,
             )
             return
 
-        # Choose between evaluation mode or recognition mode
-        angle_breakdown = {}
-        orientation = "front"
-        orientation_valid = True
-
-        if target_pose:
-            # Evaluation mode: evaluate against target pose
-            confidence, angle_breakdown, orientation, orientation_valid = (
-                pose_recognizer.evaluate_target_pose(pose_result["landmarks"], target_pose)
-            )
-            pose_name = target_pose
-
-            # Generate feedback based on orientation validity
-            feedback = []
-            if not orientation_valid:
-                # Wrong orientation - provide guidance
-                required = POSE_ORIENTATIONS.get(target_pose, [])
-                feedback = [get_orientation_feedback(orientation, required)]
-            elif confidence is not None and confidence > 0.0:
-                feedback = pose_analyzer.analyze(target_pose, pose_result["landmarks"])
-            else:
-                feedback = [
-                    "Unable to detect pose. Please ensure you're visible in the camera and try the pose again."
-                ]
-        else:
-            # Recognition mode: detect what pose user is doing
-            pose_name, confidence = pose_recognizer.recognize(pose_result["landmarks"])
-
-            # Analyze pose quality
-            feedback = []
-            if pose_name != "Unknown":
-                feedback = pose_analyzer.analyze(pose_name, pose_result["landmarks"])
+        no_pose_sent.pop(sid, None)
+        pose_name, confidence, angle_breakdown, orientation, orientation_valid, feedback = analysis
 
         # Use Gemini for richer feedback (with caching) - only when orientation is valid
         gemini_feedback = None
@@ -138,7 +207,7 @@ async def video_frame(sid, data):
             and confidence > 0.0
         ):
             gemini_feedback = await _get_gemini_feedback(
-                sid, image_base64, target_pose, confidence, angle_breakdown
+                sid, image_bytes, target_pose, confidence, angle_breakdown
             )
 
         # Prefer Gemini feedback if available, fallback to rule-based
@@ -152,9 +221,12 @@ async def video_frame(sid, data):
             "orientation": orientation,
             "orientationValid": orientation_valid,
             "feedback": final_feedback,
-            "timestamp": int(time.time() * 1000),
+            "timestamp": time.time_ns() // 1_000_000,
         }
 
+        # The result holds every landmark: never keep it for a client that has disconnected
+        if sid in connected_clients:
+            last_results[sid] = (payload_key, result)
         await sio.emit("pose_result", result, room=sid)
 
     except Exception:
@@ -162,42 +234,104 @@ async def video_frame(sid, data):
         await sio.emit("error", {"message": "Error processing frame"}, room=sid)
 
 
-async def _get_gemini_feedback(
-    sid: str, image_base64: str, target_pose: str, confidence: float, angle_breakdown: dict
-) -> list[str] | None:
+def _process_frame(
+    sid: str, image_bytes: bytes, target_pose: str | None
+) -> tuple[dict | None, FrameAnalysis | None] | None:
     """
-    Get Gemini feedback with caching to reduce API calls.
+    Decode, detect and analyze one frame; runs on the pose executor thread.
 
-    Calls Gemini every GEMINI_CALL_INTERVAL seconds, returns cached feedback otherwise.
-    """
-    current_time = time.time()
-
-    # Initialize cache for this client if needed
-    if sid not in gemini_cache:
-        gemini_cache[sid] = {"last_call": 0, "feedback": None, "target_pose": None}
+    Args:
+        sid: Socket ID, used to pick the client's decode scale
+        image_bytes: Encoded JPEG frame
+        target_pose: Pose to evaluate against, or None to recognize the pose
 
-    cache = gemini_cache[sid]
+    Returns:
+        (pose_result, analysis), both None if no pose was detected,
+        or None if the image can't be decoded
+    """
+    # A client's frames keep one resolution, so the previous frame's width picks the
+    # decode factor: wide JPEGs are decoded at 1/2, 1/4 or 1/8 size, but no narrower than
+    # MAX_FRAME_WIDTH. A resolution change is picked up from the next frame on.
+    scale = decode_scales.get(sid, 1)
+    image = decode_image(image_bytes, scale)
+    if image is None:
+        return None
+    if sid in connected_clients:
+        decode_scales[sid] = decode_scale(image.shape[1] * scale)
+
+    # Detect pose on a frame no wider than MAX_FRAME_WIDTH
+    pose_result = pose_detector.detect(downscale_frame(image))
+    if not pose_result or not pose_result["landmarks"]:
+        return None, None
+
+    # Recognizer and analyzer read the landmark array; the dictionaries are sent to the client
+    landmarks = pose_result["landmarks_array"]
+    return pose_result, _analyze_landmarks(landmarks, target_pose)
+
+
+def _analyze_landmarks(landmarks: np.ndarray, target_pose: str | None) -> FrameAnalysis:
+    """
+    Recognize or evaluate the pose in one frame and build rule-based feedback.
 
-    # Check if we should make a new Gemini call
-    time_since_last = current_time - cache["last_call"]
-    pose_changed = cache["target_pose"] != target_pose
+    Args:
+        landmarks: (33, 4) landmark array from the detector
+        target_pose: Pose to evaluate against, or None to recognize the pose
 
-    if time_since_last >= GEMINI_CALL_INTERVAL or pose_changed:
-        # Update last_call BEFORE making the API call to prevent retry storms
-        cache["last_call"] = current_time
-        cache["target_pose"] = target_pose
+    Returns:
+        FrameAnalysis for the frame
+    """
+    # Choose between evaluation mode or recognition mode
+    angle_breakdown = {}
+    orientation = "front"
+    orientation_valid = True
+
+    if target_pose:
+        # Evaluation mode: evaluate against target pose
+        confidence, angle_breakdown, orientation, orientation_valid = (
+            pose_recognizer.evaluate_target_pose(landmarks, target_pose)
+        )
+        pose_name = target_pose
+
+        # Generate feedback based on orientation validity
+        feedback = []
+        if not orientation_valid:
+            # Wrong orientation - provide guidance
+            required = POSE_ORIENTATIONS.get(target_pose, [])
+            feedback = [get_orientation_feedback(orientation, required)]
+        elif confidence is not None and confidence > FEEDBACK_THRESHOLD:
+            feedback = pose_analyzer.analyze(target_pose, landmarks)
+        elif confidence is not None and confidence > 0.0:
+            # Too far from the target pose for the alignment rules to be meaningful
+            feedback = []
+        else:
+            feedback = [
+                "Unable to detect pose. Please ensure you're visible in the camera and try the pose again."
+            ]
+    else:
+        # Recognition mode: detect what pose user is doing
+        pose_name, confidence = pose_recognizer.recognize(landmarks)
 
-        # Make Gemini API call (non-blocking for the main loop)
-        try:
-            feedback = await gemini_analyzer.analyze_pose(
-                image_base64, target_pose, confidence, angle_breakdown
-            )
+        # Analyze pose quality
+        feedback = []
+        if pose_name != "Unknown":
+            feedback = pose_analyzer.analyze(pose_name, landmarks)
 
-            if feedback:
-                cache["feedback"] = feedback
+    return FrameAnalysis(
+        pose_name, confidence, angle_breakdown, orientation, orientation_valid, feedback
+    )
 
-        except Exception:
-            logger.exception("Gemini call failed")
-            # Keep using cached feedback on error
 
-    return cache["feedback"]
+async def _get_gemini_feedback(
+    sid: str, image_bytes: bytes, target_pose: str, confidence: float, angle_breakdown: dict
+) -> list[str] | None:
+    """
+    Get the client's Gemini feedback, refreshing it in the background at most every
+    GEMINI_CALL_INTERVAL seconds.
+    """
+    # Entries are created on connect; a missing one means the client has disconnected
+    cache = gemini_cache.get(sid)
+    if cache is None:
+        return None
+    return await request_feedback(
+        cache, gemini_analyzer, image_bytes, target_pose, confidence, angle_breakdown
+    )
@@ -1,81 +1,117 @@
 """Shared test fixtures for backend tests."""
 
+import numpy as np
 import pytest
 
-
-@pytest.fixture
-def sample_landmarks() -> list[dict]:
+from app.session_generator import generate_session
+
+# Approximate positions for 33 MediaPipe pose landmarks of a person standing in a neutral pose
+# (normalized 0-1 coordinates; MediaPipe uses x=horizontal, y=vertical (0=top), z=depth)
+STANDING_POSITIONS = (
+    # Face landmarks (0-10)
+    (0.5, 0.1, 0.0),  # 0: nose
+    (0.48, 0.08, 0.0),  # 1: left eye inner
+    (0.47, 0.08, 0.0),  # 2: left eye
+    (0.46, 0.08, 0.0),  # 3: left eye outer
+    (0.52, 0.08, 0.0),  # 4: right eye inner
+    (0.53, 0.08, 0.0),  # 5: right eye
+    (0.54, 0.08, 0.0),  # 6: right eye outer
+    (0.45, 0.09, 0.0),  # 7: left ear
+    (0.55, 0.09, 0.0),  # 8: right ear
+    (0.48, 0.12, 0.0),  # 9: mouth left
+    (0.52, 0.12, 0.0),  # 10: mouth right
+    # Upper body (11-22)
+    (0.4, 0.25, 0.0),  # 11: left shoulder
+    (0.6, 0.25, 0.0),  # 12: right shoulder
+    (0.35, 0.4, 0.0),  # 13: left elbow
+    (0.65, 0.4, 0.0),  # 14: right elbow
+    (0.3, 0.55, 0.0),  # 15: left wrist
+    (0.7, 0.55, 0.0),  # 16: right wrist
+    (0.28, 0.57, 0.0),  # 17: left pinky
+    (0.72, 0.57, 0.0),  # 18: right pinky
+    (0.27, 0.56, 0.0),  # 19: left index
+    (0.73, 0.56, 0.0),  # 20: right index
+    (0.29, 0.58, 0.0),  # 21: left thumb
+    (0.71, 0.58, 0.0),  # 22: right thumb
+    # Lower body (23-32)
+    (0.45, 0.5, 0.0),  # 23: left hip
+    (0.55, 0.5, 0.0),  # 24: right hip
+    (0.45, 0.7, 0.0),  # 25: left knee
+    (0.55, 0.7, 0.0),  # 26: right knee
+    (0.45, 0.9, 0.0),  # 27: left ankle
+    (0.55, 0.9, 0.0),  # 28: right ankle
+    (0.44, 0.92, 0.0),  # 29: left heel
+    (0.56, 0.92, 0.0),  # 30: right heel
+    (0.43, 0.91, 0.0),  # 31: left foot index
+    (0.57, 0.91, 0.0),  # 32: right foot index
+)
+
+# Visibility given to every sample landmark
+SAMPLE_VISIBILITY = 0.99
+
+
+@pytest.fixture(scope="session")
+def sample_landmarks_template() -> tuple[dict, ...]:
     """
-    Generate sample MediaPipe landmarks for testing.
+    Build the sample MediaPipe landmarks once per test session.
 
     Returns 33 landmarks with normalized x, y, z coordinates.
     This represents a person in a neutral standing pose.
+    Shared by every test: never mutate it, request sample_landmarks instead.
     """
-    # Base landmarks for a standing person (normalized 0-1 coordinates)
-    # MediaPipe uses: x=horizontal, y=vertical (0=top), z=depth
     landmarks = []
-
-    # Approximate positions for 33 MediaPipe pose landmarks
-    positions = [
-        # Face landmarks (0-10)
-        (0.5, 0.1, 0.0),  # 0: nose
-        (0.48, 0.08, 0.0),  # 1: left eye inner
-        (0.47, 0.08, 0.0),  # 2: left eye
-        (0.46, 0.08, 0.0),  # 3: left eye outer
-        (0.52, 0.08, 0.0),  # 4: right eye inner
-        (0.53, 0.08, 0.0),  # 5: right eye
-        (0.54, 0.08, 0.0),  # 6: right eye outer
-        (0.45, 0.09, 0.0),  # 7: left ear
-        (0.55, 0.09, 0.0),  # 8: right ear
-        (0.48, 0.12, 0.0),  # 9: mouth left
-        (0.52, 0.12, 0.0),  # 10: mouth right
-        # Upper body (11-22)
-        (0.4, 0.25, 0.0),  # 11: left shoulder
-        (0.6, 0.25, 0.0),  # 12: right shoulder
-        (0.35, 0.4, 0.0),  # 13: left elbow
-        (0.65, 0.4, 0.0),  # 14: right elbow
-        (0.3, 0.55, 0.0),  # 15: left wrist
-        (0.7, 0.55, 0.0),  # 16: right wrist
-        (0.28, 0.57, 0.0),  # 17: left pinky
-        (0.72, 0.57, 0.0),  # 18: right pinky
-        (0.27, 0.56, 0.0),  # 19: left index
-        (0.73, 0.56, 0.0),  # 20: right index
-        (0.29, 0.58, 0.0),  # 21: left thumb
-        (0.71, 0.58, 0.0),  # 22: right thumb
-        # Lower body (23-32)
-        (0.45, 0.5, 0.0),  # 23: left hip
-        (0.55, 0.5, 0.0),  # 24: right hip
-        (0.45, 0.7, 0.0),  # 25: left knee
-        (0.55, 0.7, 0.0),  # 26: right knee
-        (0.45, 0.9, 0.0),  # 27: left ankle
-        (0.55, 0.9, 0.0),  # 28: right ankle
-        (0.44, 0.92, 0.0),  # 29: left heel
-        (0.56, 0.92, 0.0),  # 30: right heel
-        (0.43, 0.91, 0.0),  # 31: left foot index
-        (0.57, 0.91, 0.0),  # 32: right foot index
-    ]
-
-    for x, y, z in positions:
+    for x, y, z in STANDING_POSITIONS:
         landmarks.append(
             {
                 "x": x,
                 "y": y,
                 "z": z,
-                "visibility": 0.99,
+                "visibility": SAMPLE_VISIBILITY,
             }
         )
 
-    return landmarks
+    return tuple(landmarks)
+
+
+@pytest.fixture
+def sample_landmarks(sample_landmarks_template: tuple[dict, ...]) -> list[dict]:
+    """
+    Sample MediaPipe landmarks for testing, safe to modify.
+
+    A fresh copy of the session template, so tests can mutate it freely.
+    """
+    return [lm.copy() for lm in sample_landmarks_template]
+
+
+@pytest.fixture(scope="session")
+def sample_landmarks_array_template() -> np.ndarray:
+    """
+    The standing sample pose as a read-only (33, 4) float32 landmark array.
+
+    Built once per test session, in the layout PoseDetector.detect returns as
+    landmarks_array. Request sample_landmarks_np for a writable copy.
+    """
+    array = np.empty((len(STANDING_POSITIONS), 4), dtype=np.float32)
+    array[:, :3] = STANDING_POSITIONS
+    array[:, 3] = SAMPLE_VISIBILITY
+    array.setflags(write=False)
+    return array
+
+
+@pytest.fixture
+def sample_landmarks_np(sample_landmarks_array_template: np.ndarray) -> np.ndarray:
+    """Sample landmark array for testing the array code paths, safe to modify."""
+    return sample_landmarks_array_template.copy()
 
 
 @pytest.fixture
-def warrior_ii_left_landmarks(sample_landmarks: list[dict]) -> list[dict]:
+def warrior_ii_left_landmarks(sample_landmarks_template: tuple[dict, ...]) -> list[dict]:
     """
     Modify sample landmarks to represent Warrior II Left pose.
 
     Left leg bent at ~90 degrees, arms extended horizontally.
     """
-    landmarks = [lm.copy() for lm in sample_landmarks]
+    landmarks = [lm.copy() for lm in sample_landmarks_template]
 
     # Left leg bent (front leg) - knee forward
     landmarks[25]["x"] = 0.3  # left knee forward
@@ -104,13 +140,13 @@ def warrior_ii_left_landmarks(sample_landmarks: list[dict]) -> list[dict]:
 
 
 @pytest.fixture
-def tree_pose_right_landmarks(sample_landmarks: list[dict]) -> list[dict]:
+def tree_pose_right_landmarks(sample_landmarks_template: tuple[dict, ...]) -> list[dict]:
     """
     Modify sample landmarks to represent Tree Pose Right (standing on right leg).
 
     Right leg straight, left foot on inner right thigh.
     """
-    landmarks = [lm.copy() for lm in sample_landmarks]
+    landmarks = [lm.copy() for lm in sample_landmarks_template]
 
     # Right leg straight (standing leg)
     landmarks[24]["y"] = 0.5  # right hip
@@ -127,3 +163,49 @@ def tree_pose_right_landmarks(sample_landmarks: list[dict]) -> list[dict]:
     landmarks[27]["y"] = 0.6
 
     return landmarks
+
+
+@pytest.fixture(scope="session")
+def neck_session() -> dict:
+    """A 10-minute session for neck pain, built once per test session. Never mutate it."""
+    return generate_session(["neck"], [], 10)
+
+
+@pytest.fixture(scope="session")
+def sessions_by_duration(neck_session: dict) -> dict[int, dict]:
+    """Neck pain sessions of 10, 15 and 30 minutes by duration, built once per test session."""
+    return {
+        10: neck_session,
+        15: generate_session(["neck"], [], 15),
+        30: generate_session(["neck"], [], 30),
+    }
+
+
+@pytest.fixture(scope="session")
+def hips_session() -> dict:
+    """A 10-minute session for hip pain, built once per test session. Never mutate it."""
+    return generate_session(["hips"], [], 10)
+
+
+@pytest.fixture(scope="session")
+def hips_pose_names(hips_session: dict) -> frozenset[str]:
+    """Names of the poses in hips_session."""
+    return frozenset(pose["pose_name"] for pose in hips_session["poses"])
+
+
+@pytest.fixture(scope="session")
+def balance_session() -> dict:
+    """A 10-minute session improving balance, built once per test session. Never mutate it."""
+    return generate_session([], ["balance"], 10)
+
+
+@pytest.fixture(scope="session")
+def balance_pose_names(balance_session: dict) -> frozenset[str]:
+    """Names of the poses in balance_session."""
+    return frozenset(pose["pose_name"] for pose in balance_session["poses"])
+
+
+@pytest.fixture(scope="session")
+def default_session() -> dict:
+    """A 10-minute session with no focus areas, built once per test session. Never mutate it."""
+    return generate_session([], [], 10)
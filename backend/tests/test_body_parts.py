@@ -2,14 +2,28 @@
 
 from app.body_parts import (
     ASYMMETRIC_POSE_PAIRS,
+    ASYMMETRIC_POSES,
     BODY_PART_POSES,
+    CATEGORY_COOLDOWN,
+    CATEGORY_OTHER,
+    CATEGORY_PEAK,
+    CATEGORY_WARMUP,
     COOLDOWN_POSES,
+    DIFFICULTY_CODES,
     PEAK_POSES,
+    POSE_BASE_DURATION,
+    POSE_CATEGORY,
+    POSE_DIFFICULTY,
+    POSE_INDEX,
     POSE_METADATA,
+    POSE_NAMES,
+    POSE_PARTNER,
     WARMUP_POSES,
+    PoseMetadata,
     get_pose_pair,
     get_poses_for_body_parts,
     is_asymmetric_pose,
+    with_pose_pairs,
 )
 
 
@@ -19,28 +33,45 @@ class TestPoseMetadata:
     def test_all_poses_have_required_fields(self):
         """Every pose must have base_duration, difficulty, and targets."""
         for pose_name, metadata in POSE_METADATA.items():
-            assert "base_duration" in metadata, f"{pose_name} missing base_duration"
-            assert "difficulty" in metadata, f"{pose_name} missing difficulty"
-            assert "targets" in metadata, f"{pose_name} missing targets"
+            assert isinstance(metadata, PoseMetadata), f"{pose_name} is not PoseMetadata"
+            assert metadata._fields == ("base_duration", "difficulty", "targets")
 
     def test_difficulty_values_are_valid(self):
         """Difficulty should be 'easy', 'medium', or 'hard'."""
         valid_difficulties = {"easy", "medium", "hard"}
         for pose_name, metadata in POSE_METADATA.items():
             assert (
-                metadata["difficulty"] in valid_difficulties
-            ), f"{pose_name} has invalid difficulty: {metadata['difficulty']}"
+                metadata.difficulty in valid_difficulties
+            ), f"{pose_name} has invalid difficulty: {metadata.difficulty}"
 
     def test_base_duration_is_positive(self):
         """Base duration should be a positive number."""
         for pose_name, metadata in POSE_METADATA.items():
-            assert metadata["base_duration"] > 0, f"{pose_name} has non-positive duration"
+            assert metadata.base_duration > 0, f"{pose_name} has non-positive duration"
 
-    def test_targets_is_non_empty_list(self):
+    def test_targets_is_non_empty_tuple(self):
         """Each pose should target at least one body part."""
         for pose_name, metadata in POSE_METADATA.items():
-            assert isinstance(metadata["targets"], list), f"{pose_name} targets is not a list"
-            assert len(metadata["targets"]) > 0, f"{pose_name} has no targets"
+            assert isinstance(metadata.targets, tuple), f"{pose_name} targets is not a tuple"
+            assert len(metadata.targets) > 0, f"{pose_name} has no targets"
+
+
+class TestPoseArrays:
+    """Tests for the structure-of-arrays view of POSE_METADATA."""
+
+    def test_arrays_aligned_with_names(self):
+        """Every array should have one entry per pose name."""
+        assert len(POSE_NAMES) == len(POSE_METADATA)
+        assert len(POSE_BASE_DURATION) == len(POSE_NAMES)
+        assert len(POSE_DIFFICULTY) == len(POSE_NAMES)
+
+    def test_arrays_match_metadata(self):
+        """Array values should mirror the POSE_METADATA entries."""
+        for pose_name, metadata in POSE_METADATA.items():
+            i = POSE_INDEX[pose_name]
+            assert POSE_NAMES[i] == pose_name
+            assert POSE_BASE_DURATION[i] == metadata.base_duration
+            assert POSE_DIFFICULTY[i] == DIFFICULTY_CODES[metadata.difficulty]
 
 
 class TestBodyPartPoses:
@@ -73,12 +104,44 @@ class TestAsymmetricPosePairs:
             left_meta = POSE_METADATA[left]
             right_meta = POSE_METADATA[right]
             assert (
-                left_meta["base_duration"] == right_meta["base_duration"]
+                left_meta.base_duration == right_meta.base_duration
             ), f"Pair {left}/{right} has different durations"
             assert (
-                left_meta["difficulty"] == right_meta["difficulty"]
+                left_meta.difficulty == right_meta.difficulty
             ), f"Pair {left}/{right} has different difficulties"
 
+    def test_partner_array_matches_pairs(self):
+        """POSE_PARTNER should point each paired pose at its partner and hold -1 otherwise."""
+        for i, pose in enumerate(POSE_NAMES):
+            partner = get_pose_pair(pose)
+            expected = -1 if partner is None else POSE_INDEX[partner]
+            assert POSE_PARTNER[i] == expected, f"{pose} has wrong partner"
+
+    def test_asymmetric_poses_cover_all_pairs(self):
+        """ASYMMETRIC_POSES should hold exactly the poses listed in pairs."""
+        assert {pose for pair in ASYMMETRIC_POSE_PAIRS for pose in pair} == ASYMMETRIC_POSES
+
+
+class TestWithPosePairs:
+    """Tests for with_pose_pairs function."""
+
+    def test_adds_missing_partner(self):
+        """An asymmetric pose should bring in its partner."""
+        assert with_pose_pairs({"Tree Pose Left", "Plank"}) == {
+            "Tree Pose Left",
+            "Tree Pose Right",
+            "Plank",
+        }
+
+    def test_symmetric_poses_unchanged(self):
+        """Symmetric poses should be returned as-is."""
+        assert with_pose_pairs({"Plank", "Easy Seat"}) == {"Plank", "Easy Seat"}
+
+    def test_complete_pair_not_duplicated(self):
+        """A pair already present should not grow the set."""
+        poses = {"Warrior II Left", "Warrior II Right"}
+        assert with_pose_pairs(poses) == poses
+
 
 class TestFlowCategories:
     """Tests for pose flow categories (warmup, peak, cooldown)."""
@@ -98,6 +161,19 @@ class TestFlowCategories:
         for pose in COOLDOWN_POSES:
             assert pose in POSE_METADATA, f"Cooldown pose '{pose}' not in POSE_METADATA"
 
+    def test_pose_category_matches_flow_sets(self):
+        """POSE_CATEGORY should agree with the flow sets, warmup first."""
+        for i, pose in enumerate(POSE_NAMES):
+            if pose in WARMUP_POSES:
+                expected = CATEGORY_WARMUP
+            elif pose in PEAK_POSES:
+                expected = CATEGORY_PEAK
+            elif pose in COOLDOWN_POSES:
+                expected = CATEGORY_COOLDOWN
+            else:
+                expected = CATEGORY_OTHER
+            assert POSE_CATEGORY[i] == expected, f"{pose} has wrong category"
+
 
 class TestGetPosesForBodyParts:
     """Tests for get_poses_for_body_parts function."""
@@ -138,6 +214,12 @@ class TestGetPosesForBodyParts:
         poses = get_poses_for_body_parts(["hips", "flexibility"])
         assert len(poses) == len(set(poses))
 
+    def test_order_is_deterministic(self):
+        """Result order should not depend on the order of the input body parts."""
+        forward = get_poses_for_body_parts(["neck", "shoulders", "hips"])
+        backward = get_poses_for_body_parts(["hips", "shoulders", "neck"])
+        assert forward == backward
+
 
 class TestIsAsymmetricPose:
     """Tests for is_asymmetric_pose function."""
@@ -0,0 +1,103 @@
+"""Tests for background Gemini feedback refreshes."""
+
+import asyncio
+
+from app.services.gemini_feedback import GeminiCacheEntry, request_feedback
+
+
+class FakeAnalyzer:
+    """Stand-in for GeminiPoseAnalyzer whose calls finish when released."""
+
+    def __init__(self, feedback: list[str]):
+        self.feedback = feedback
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def analyze_pose(self, _image_bytes, _target_pose, _confidence, _angle_breakdown):
+        self.calls += 1
+        await self.release.wait()
+        return self.feedback
+
+
+async def _request(cache: GeminiCacheEntry, analyzer: FakeAnalyzer, target_pose: str = "Plank"):
+    """Request feedback for a fixed frame."""
+    return await request_feedback(cache, analyzer, b"jpeg", target_pose, 0.8, {})
+
+
+async def _finish(analyzer: FakeAnalyzer):
+    """Let pending Gemini calls complete."""
+    analyzer.release.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def _raise(*_args):
+    """Gemini call that fails."""
+    raise RuntimeError("Gemini unavailable")
+
+
+class TestRequestFeedback:
+    """Tests for request_feedback."""
+
+    async def test_returns_without_waiting_for_gemini(self):
+        """The first request should return at once and start a call in the background."""
+        cache = GeminiCacheEntry()
+        analyzer = FakeAnalyzer(["Engage your core"])
+
+        assert await asyncio.wait_for(_request(cache, analyzer), timeout=1) is None
+        await asyncio.sleep(0)
+        assert analyzer.calls == 1
+
+        await _finish(analyzer)
+        assert cache.feedback == ["Engage your core"]
+
+    async def test_serves_feedback_within_interval(self):
+        """Requests within the call interval should reuse feedback without a new call."""
+        cache = GeminiCacheEntry()
+        analyzer = FakeAnalyzer(["Engage your core"])
+        await _request(cache, analyzer)
+        await _finish(analyzer)
+
+        assert await _request(cache, analyzer) == ["Engage your core"]
+        assert analyzer.calls == 1
+
+    async def test_pose_change_drops_previous_feedback(self):
+        """Feedback for the previous pose should not be served for a new target pose."""
+        cache = GeminiCacheEntry()
+        analyzer = FakeAnalyzer(["Engage your core"])
+        await _request(cache, analyzer)
+        await _finish(analyzer)
+
+        assert await _request(cache, analyzer, "Tree Pose Left") is None
+        await _finish(analyzer)
+        assert analyzer.calls == 2
+
+    async def test_skips_call_while_one_is_in_flight(self):
+        """A refresh that is due while a call is in flight should not start a second call."""
+        cache = GeminiCacheEntry()
+        analyzer = FakeAnalyzer(["Engage your core"])
+        await _request(cache, analyzer)
+        await asyncio.sleep(0)
+        assert cache.lock.locked()
+
+        # Past the interval, the pose changes while the first call is still running
+        cache.last_call -= 10
+        assert await _request(cache, analyzer, "Tree Pose Left") is None
+        assert await _request(cache, analyzer) is None
+        await asyncio.sleep(0)
+        assert analyzer.calls == 1
+
+        await _finish(analyzer)
+        assert not cache.lock.locked()
+
+    async def test_failed_call_releases_lock(self):
+        """A failing Gemini call should keep cached feedback and free the lock."""
+        cache = GeminiCacheEntry(feedback=["Keep breathing"], target_pose="Plank")
+        analyzer = FakeAnalyzer([])
+        analyzer.analyze_pose = _raise
+
+        assert await _request(cache, analyzer) == ["Keep breathing"]
+        await _finish(analyzer)
+
+        assert not cache.lock.locked()
+        assert cache.feedback == ["Keep breathing"]
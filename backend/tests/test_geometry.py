@@ -2,93 +2,60 @@
 
 import math
 
-from app.utils.geometry import calculate_angle
+import numpy as np
 
+from app.utils.geometry import calculate_angle_array, calculate_angles
 
-class TestCalculateAngle:
-    """Tests for the calculate_angle function."""
 
-    def test_straight_line_returns_180_degrees(self):
-        """Three points in a straight horizontal line should give 180 degrees."""
-        point1 = {"x": 0.0, "y": 0.5}
-        point2 = {"x": 0.5, "y": 0.5}  # vertex
-        point3 = {"x": 1.0, "y": 0.5}
+class TestCalculateAngles:
+    """Tests for the batched calculate_angles function."""
 
-        angle = calculate_angle(point1, point2, point3)
+    def test_matches_calculate_angle_array(self):
+        """Each batched angle should match calculate_angle_array on its own points."""
+        points = np.array([[0.0, 0.5], [0.5, 0.5], [1.0, 0.5], [0.5, 0.0], [0.3, 0.1]])
+        triplets = np.array([[0, 1, 2], [0, 1, 3], [4, 1, 2]])
 
-        # Tolerance of 0.2 accounts for epsilon in denominator (prevents div by zero)
-        assert math.isclose(angle, 180.0, abs_tol=0.2)
+        angles = calculate_angles(points, triplets)
 
-    def test_right_angle_returns_90_degrees(self):
-        """Three points forming an L-shape should give 90 degrees."""
-        point1 = {"x": 0.0, "y": 0.5}
-        point2 = {"x": 0.5, "y": 0.5}  # vertex
-        point3 = {"x": 0.5, "y": 0.0}
+        for angle, (i, j, k) in zip(angles, triplets, strict=True):
+            expected = calculate_angle_array(points[i], points[j], points[k])
+            assert math.isclose(angle, expected, abs_tol=1e-6)
 
-        angle = calculate_angle(point1, point2, point3)
+    def test_ignores_z(self):
+        """Extra columns beyond x and y should not affect the result."""
+        points = np.array([[0.0, 0.5, 9.0], [0.5, 0.5, -3.0], [0.5, 0.0, 1.0]])
 
-        assert math.isclose(angle, 90.0, abs_tol=0.1)
+        angles = calculate_angles(points, np.array([[0, 1, 2]]))
 
-    def test_45_degree_angle(self):
-        """Three points forming a 45-degree angle."""
-        # v1 = (0, -0.5) pointing down, v2 = (0.5, -0.5) pointing down-right at 45°
-        point1 = {"x": 0.5, "y": 0.0}
-        point2 = {"x": 0.5, "y": 0.5}  # vertex
-        point3 = {"x": 1.0, "y": 0.0}
+        assert math.isclose(angles[0], 90.0, abs_tol=1e-6)
 
-        angle = calculate_angle(point1, point2, point3)
+    def test_handles_zero_vector(self):
+        """Coincident points should give 90 degrees rather than NaN."""
+        points = np.array([[0.5, 0.5], [0.5, 0.5], [0.5, 0.6]])
 
-        assert math.isclose(angle, 45.0, abs_tol=0.1)
+        angles = calculate_angles(points, np.array([[0, 1, 2]]))
 
-    def test_acute_angle(self):
-        """Test an acute angle (less than 90 degrees)."""
-        point1 = {"x": 0.3, "y": 0.0}
-        point2 = {"x": 0.5, "y": 0.5}  # vertex
-        point3 = {"x": 0.7, "y": 0.0}
+        assert angles.tolist() == [90.0]
 
-        angle = calculate_angle(point1, point2, point3)
 
-        assert 0 < angle < 90
+class TestCalculateAngleArray:
+    """Tests for the broadcasting calculate_angle_array function."""
 
-    def test_obtuse_angle(self):
-        """Test an obtuse angle (between 90 and 180 degrees)."""
-        point1 = {"x": 0.0, "y": 0.4}
-        point2 = {"x": 0.5, "y": 0.5}  # vertex
-        point3 = {"x": 1.0, "y": 0.4}
+    def test_single_points(self):
+        """1-D points should give a scalar angle."""
+        angle = calculate_angle_array(
+            np.array([0.0, 0.5]), np.array([0.5, 0.5]), np.array([0.5, 0.0])
+        )
+        assert angle.shape == ()
+        assert math.isclose(angle, 90.0, abs_tol=1e-6)
 
-        angle = calculate_angle(point1, point2, point3)
+    def test_broadcasts_leading_axes(self):
+        """Leading axes should be preserved for batches of points."""
+        a = np.tile([0.0, 0.5, 0.0], (4, 5, 1))
+        b = np.array([0.5, 0.5, 0.0])
+        c = np.tile([1.0, 0.5, 0.0], (4, 5, 1))
 
-        assert 90 < angle < 180
+        angles = calculate_angle_array(a, b, c)
 
-    def test_returns_float(self):
-        """Result should always be a float."""
-        point1 = {"x": 0.0, "y": 0.0}
-        point2 = {"x": 0.5, "y": 0.5}
-        point3 = {"x": 1.0, "y": 0.0}
-
-        angle = calculate_angle(point1, point2, point3)
-
-        assert isinstance(angle, float)
-
-    def test_symmetric_angle(self):
-        """Angle should be the same regardless of point1/point3 order."""
-        point1 = {"x": 0.0, "y": 0.5}
-        point2 = {"x": 0.5, "y": 0.5}
-        point3 = {"x": 0.5, "y": 0.0}
-
-        angle1 = calculate_angle(point1, point2, point3)
-        angle2 = calculate_angle(point3, point2, point1)
-
-        assert math.isclose(angle1, angle2, abs_tol=0.01)
-
-    def test_handles_zero_vector_gracefully(self):
-        """Should handle case where points are very close (epsilon prevents division by zero)."""
-        point1 = {"x": 0.5, "y": 0.5}
-        point2 = {"x": 0.5, "y": 0.5}  # same as point1
-        point3 = {"x": 0.5, "y": 0.6}
-
-        # Should not raise an exception due to epsilon in denominator
-        angle = calculate_angle(point1, point2, point3)
-
-        assert isinstance(angle, float)
-        assert not math.isnan(angle)
+        assert angles.shape == (4, 5)
+        assert np.allclose(angles, 180.0)
@@ -0,0 +1,33 @@
+"""Tests for landmark array helpers."""
+
+import numpy as np
+
+from app.utils.landmarks import VISIBILITY, X, Y, landmarks_to_array
+
+
+class TestLandmarksToArray:
+    """Tests for the landmarks_to_array function."""
+
+    def test_converts_dicts(self, sample_landmarks):
+        """Dictionaries should become a (33, 4) float32 array."""
+        array = landmarks_to_array(sample_landmarks)
+
+        assert array.shape == (33, 4)
+        assert array.dtype == np.float32
+        assert np.isclose(array[11, X], 0.4)
+        assert np.isclose(array[11, Y], 0.25)
+        assert np.isclose(array[11, VISIBILITY], 0.99)
+
+    def test_array_fixture_matches_dicts(self, sample_landmarks, sample_landmarks_np):
+        """The array fixture should equal the converted dictionary fixture."""
+        np.testing.assert_array_equal(landmarks_to_array(sample_landmarks), sample_landmarks_np)
+
+    def test_passes_float32_arrays_through(self):
+        """A float32 array should be returned without copying."""
+        array = np.zeros((33, 4), dtype=np.float32)
+        assert landmarks_to_array(array) is array
+
+    def test_casts_other_arrays(self):
+        """Arrays of other dtypes should be cast to float32."""
+        array = landmarks_to_array(np.zeros((33, 4), dtype=np.float64))
+        assert array.dtype == np.float32
@@ -0,0 +1,41 @@
+"""Tests for the queue-based logging setup."""
+
+import atexit
+import logging
+from logging.handlers import QueueHandler
+
+from app.utils.log_queue import setup_queue_logging
+
+
+def _stop(listener):
+    """Stop a listener now instead of at interpreter exit."""
+    atexit.unregister(listener.stop)
+    listener.stop()
+
+
+class TestSetupQueueLogging:
+    """Tests for setup_queue_logging."""
+
+    def test_records_reach_listener_handler(self):
+        """Records logged on the caller should be written by the listener's handler."""
+        listener = setup_queue_logging("tests.log_queue.records")
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        listener.handlers = (handler,)
+
+        logging.getLogger("tests.log_queue.records.child").info("frame processed")
+        _stop(listener)
+
+        assert [record.getMessage() for record in records] == ["frame processed"]
+
+    def test_second_call_is_noop(self):
+        """Configuring the same logger twice should not add a second queue handler."""
+        name = "tests.log_queue.idempotent"
+        listener = setup_queue_logging(name)
+        try:
+            assert setup_queue_logging(name) is None
+            handlers = logging.getLogger(name).handlers
+            assert sum(isinstance(handler, QueueHandler) for handler in handlers) == 1
+        finally:
+            _stop(listener)
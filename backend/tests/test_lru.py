@@ -0,0 +1,43 @@
+"""Tests for the LRUCache utility."""
+
+from app.utils.lru import LRUCache
+
+
+class TestLRUCache:
+    """Tests for LRUCache eviction and lookups."""
+
+    def test_evicts_oldest_entry(self):
+        """Inserting past maxsize should drop the oldest entry."""
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["c"] = 3
+
+        assert list(cache) == ["b", "c"]
+
+    def test_lookup_marks_entry_recent(self):
+        """A looked-up entry should survive the next eviction."""
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache["a"] == 1
+        cache["c"] = 3
+
+        assert "a" in cache
+        assert "b" not in cache
+
+    def test_get_returns_default_for_missing_key(self):
+        """get should behave like dict.get for missing keys."""
+        cache = LRUCache(2)
+        assert cache.get("missing") is None
+        assert cache.get("missing", 0) == 0
+
+    def test_get_marks_entry_recent(self):
+        """get should refresh recency like indexing does."""
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1
+        cache["c"] = 3
+
+        assert list(cache) == ["a", "c"]
@@ -0,0 +1,263 @@
+"""Tests for pose_analysis module."""
+
+import numpy as np
+
+from app.body_parts import POSE_NAMES
+from app.pose_analysis import (
+    _RULES,
+    ANGLE_TRIPLETS,
+    HIPS,
+    POSE_PRAISE,
+    POSE_RULES,
+    SHOULDERS,
+    PoseQualityAnalyzer,
+    _evaluate_rules,
+    _joint_terms,
+    _run_rules,
+    _to_array,
+    _with_midpoints,
+    bitmask_to_messages,
+    get_orientation_feedback,
+)
+from app.utils.geometry import calculate_angles
+
+
+class TestToArray:
+    """Tests for the _to_array helper."""
+
+    def test_shape_and_dtype(self, sample_landmarks):
+        """Should pack landmarks into a (33, 3) float32 array."""
+        lm = _to_array(sample_landmarks)
+        assert lm.shape == (33, 3)
+        assert lm.dtype == np.float32
+
+    def test_accepts_array(self, sample_landmarks):
+        """Arrays with extra columns should be trimmed to x, y, z."""
+        wide = np.array([(lm["x"], lm["y"], lm["z"], 1.0) for lm in sample_landmarks])
+        lm = _to_array(wide)
+        assert lm.shape == (33, 3)
+        assert np.array_equal(lm, _to_array(sample_landmarks))
+
+    def test_preserves_coordinates(self, sample_landmarks):
+        """Rows should hold x, y, z of the matching landmark."""
+        lm = _to_array(sample_landmarks)
+        assert np.allclose(lm[11], (0.4, 0.25, 0.0))
+        assert np.allclose(lm[28], (0.55, 0.9, 0.0))
+
+
+class TestWithMidpoints:
+    """Tests for the virtual midpoint landmarks."""
+
+    def test_appends_shoulder_and_hip_midpoints(self, sample_landmarks):
+        """Midpoints should be appended after the detected landmarks."""
+        points = _with_midpoints(_to_array(sample_landmarks))
+        assert points.shape == (35, 3)
+        assert np.allclose(points[SHOULDERS], (0.5, 0.25, 0.0))
+        assert np.allclose(points[HIPS], (0.5, 0.5, 0.0))
+
+    def test_supports_batches(self):
+        """A leading frame axis should be preserved."""
+        assert _with_midpoints(np.zeros((4, 33, 3), dtype=np.float32)).shape == (4, 35, 3)
+
+
+def _terms_for_angles(degrees: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """Joint terms for unit vectors meeting at the given angles."""
+    cos = np.cos(np.radians(np.array(degrees, dtype=np.float32)))
+    return cos * np.abs(cos), np.ones_like(cos)
+
+
+class TestJointTerms:
+    """Tests for the sqrt-free joint angle terms."""
+
+    def test_matches_angle_thresholds(self, warrior_ii_left_landmarks):
+        """Comparing terms should agree with comparing calculate_angles output."""
+        lm = _to_array(warrior_ii_left_landmarks)
+        angles = calculate_angles(lm, ANGLE_TRIPLETS)
+        dot_sq, norm_sq = _joint_terms(lm)
+        for threshold in (40, 80, 100, 160, 170):
+            cos = np.cos(np.radians(threshold))
+            below = dot_sq > cos * abs(cos) * norm_sq
+            assert below.tolist() == (angles < threshold).tolist(), threshold
+
+    def test_coincident_landmarks_score_as_90_degrees(self, warrior_ii_left_landmarks):
+        """A zero-length limb should compare like the 90 degrees calculate_angles gives it."""
+        lm = _to_array(warrior_ii_left_landmarks)
+        lm[27] = lm[25]  # left ankle on the left knee
+        angles = calculate_angles(lm, ANGLE_TRIPLETS)
+        dot_sq, norm_sq = _joint_terms(lm)
+        for threshold in (40, 80, 100, 160, 170):
+            cos = np.cos(np.radians(threshold))
+            below = dot_sq > cos * abs(cos) * norm_sq
+            assert below.tolist() == (angles < threshold).tolist(), threshold
+
+    def test_collapsed_joint_gives_no_angle_feedback(self, warrior_ii_left_landmarks):
+        """A joint collapsed to one point should not trigger that joint's angle rules."""
+        lm = _to_array(warrior_ii_left_landmarks)
+        lm[27] = lm[25]  # left ankle on the left knee
+        feedback = PoseQualityAnalyzer().analyze("Warrior II Left", lm)
+        assert "Bend your left knee more - aim for 90 degrees" not in feedback
+        assert "Don't bend your left knee too much" not in feedback
+
+
+class TestRulesArrays:
+    """Tests for the packed per-pose rule arrays."""
+
+    def test_every_pose_is_compiled(self):
+        """Each rule table entry should have packed arrays."""
+        assert _RULES.keys() == POSE_RULES.keys()
+
+    def test_messages_align_with_rules(self):
+        """Packed messages should follow rule order."""
+        for pose_name, rules in POSE_RULES.items():
+            assert _RULES[pose_name].messages == tuple(rule.message for rule in rules)
+
+    def test_praise_is_single_message(self):
+        """Each pose should carry exactly one praise message."""
+        for pose_name, packed in _RULES.items():
+            assert packed.praise == (POSE_PRAISE[pose_name],)
+
+    def test_arrays_are_read_only(self):
+        """Packed arrays are shared and should not be writable."""
+        for packed in _RULES.values():
+            assert not packed.thresholds.flags.writeable
+            assert not packed.kinds.flags.writeable
+
+
+class TestEvaluateRules:
+    """Tests for the vectorized rule evaluation."""
+
+    def test_one_mask_entry_per_rule(self, sample_landmarks):
+        """The mask should have one entry per rule of the pose."""
+        lm = _to_array(sample_landmarks)
+        angles = _terms_for_angles([180.0, 180.0, 180.0, 180.0])
+        for pose_name, rules in POSE_RULES.items():
+            mask = _evaluate_rules(lm, angles, _RULES[pose_name])
+            assert mask.shape == (len(rules),), pose_name
+
+    def test_any_check_fires_rule(self, sample_landmarks):
+        """A rule should fire when only one of its checks holds."""
+        lm = _to_array(sample_landmarks)
+        angles = _terms_for_angles([180.0, 120.0, 180.0, 180.0])
+        mask = _evaluate_rules(lm, angles, _RULES["Downward Dog"])
+        assert mask.tolist() == [True, False, False]
+
+    def test_unless_suppresses_later_rule(self, sample_landmarks):
+        """An 'unless' rule should not fire alongside the rule it depends on."""
+        lm = _to_array(sample_landmarks)
+        angles = _terms_for_angles([30.0, 90.0, 180.0, 180.0])
+        mask = _evaluate_rules(lm, angles, _RULES["Supine Bound Angle"])
+        assert mask.tolist() == [True, False, False]
+
+
+class TestBitmask:
+    """Tests for rule bitmasks and message materialization."""
+
+    def test_mask_bits_follow_rule_order(self, sample_landmarks):
+        """Bit i should be set exactly when rule i fires."""
+        sample_landmarks[11]["y"] = 0.35  # left shoulder lower
+        lm = _to_array(sample_landmarks)
+        assert _run_rules(lm, _RULES["Mountain Pose"]) == 0b0010
+
+    def test_messages_for_mask(self):
+        """Set bits should map to their messages in rule order."""
+        rules = _RULES["Mountain Pose"]
+        assert bitmask_to_messages(0b0101, rules) == (rules.messages[0], rules.messages[2])
+
+    def test_empty_mask_gives_praise(self):
+        """No fired rules should give the pose's praise."""
+        rules = _RULES["Plank"]
+        assert bitmask_to_messages(0, rules) == rules.praise
+
+
+class TestAnalyze:
+    """Tests for PoseQualityAnalyzer.analyze."""
+
+    def test_insufficient_landmarks(self, sample_landmarks):
+        """Should report missing landmarks instead of analyzing."""
+        analyzer = PoseQualityAnalyzer()
+        feedback = analyzer.analyze("Mountain Pose", sample_landmarks[:10])
+        assert list(feedback) == ["Unable to analyze pose - not enough landmarks detected"]
+
+    def test_insufficient_array_landmarks(self):
+        """Short landmark arrays should be rejected too."""
+        analyzer = PoseQualityAnalyzer()
+        feedback = analyzer.analyze("Mountain Pose", np.zeros((10, 3)))
+        assert feedback == ("Unable to analyze pose - not enough landmarks detected",)
+
+    def test_array_input_matches_dicts(self, sample_landmarks):
+        """Array input should give the same feedback as dictionaries."""
+        analyzer = PoseQualityAnalyzer()
+        array = np.array([(lm["x"], lm["y"], lm["z"]) for lm in sample_landmarks])
+        for pose_name in POSE_NAMES:
+            expected = analyzer.analyze(pose_name, sample_landmarks)
+            assert analyzer.analyze(pose_name, array) == expected
+
+    def test_unknown_pose_returns_no_feedback(self, sample_landmarks):
+        """Poses without rules should return no feedback."""
+        analyzer = PoseQualityAnalyzer()
+        assert list(analyzer.analyze("Not A Pose", sample_landmarks)) == []
+
+    def test_mountain_pose_praise(self, sample_landmarks):
+        """A neutral standing pose should get praise for Mountain Pose."""
+        analyzer = PoseQualityAnalyzer()
+        feedback = analyzer.analyze("Mountain Pose", sample_landmarks)
+        assert list(feedback) == ["Great form! Maintain this position"]
+
+    def test_mountain_pose_uneven_shoulders(self, sample_landmarks):
+        """Should name the lower shoulder."""
+        analyzer = PoseQualityAnalyzer()
+        sample_landmarks[11]["y"] = 0.35
+        feedback = analyzer.analyze("Mountain Pose", sample_landmarks)
+        assert "Level your shoulders - left shoulder is lower" in feedback
+
+    def test_warrior_ii_left_knee_feedback(self, warrior_ii_left_landmarks):
+        """A shallow front-knee bend should be flagged."""
+        analyzer = PoseQualityAnalyzer()
+        feedback = analyzer.analyze("Warrior II Left", warrior_ii_left_landmarks)
+        assert "Don't bend your left knee too much" in feedback
+        assert "Extend your left arm at shoulder height" not in feedback
+
+    def test_switching_poses_uses_matching_rules(self, sample_landmarks):
+        """Repeated and alternating pose names should each use their own rules."""
+        analyzer = PoseQualityAnalyzer()
+        mountain = analyzer.analyze("Mountain Pose", sample_landmarks)
+        plank = analyzer.analyze("Plank", sample_landmarks)
+        assert analyzer.analyze("Plank", sample_landmarks) == plank
+        assert analyzer.analyze("Not A Pose", sample_landmarks) == ()
+        assert analyzer.analyze("Mountain Pose", sample_landmarks) == mountain
+        assert mountain != plank
+
+    def test_steady_frames_reuse_cached_feedback(self, sample_landmarks):
+        """Frames differing below the quantization step should hit the cache."""
+        analyzer = PoseQualityAnalyzer()
+        first = analyzer.analyze("Mountain Pose", sample_landmarks)
+        sample_landmarks[0]["x"] += 0.001
+        second = analyzer.analyze("Mountain Pose", sample_landmarks)
+        assert second is first
+
+    def test_cache_is_keyed_by_pose(self, sample_landmarks):
+        """The same frame analyzed for different poses should not share feedback."""
+        analyzer = PoseQualityAnalyzer()
+        mountain = analyzer.analyze("Mountain Pose", sample_landmarks)
+        plank = analyzer.analyze("Plank", sample_landmarks)
+        assert mountain != plank
+
+    def test_every_pose_returns_feedback(self, sample_landmarks):
+        """Each analyzed pose should produce at least one message."""
+        analyzer = PoseQualityAnalyzer()
+        for pose_name in POSE_NAMES:
+            feedback = analyzer.analyze(pose_name, sample_landmarks)
+            assert len(feedback) > 0, f"{pose_name} returned no feedback"
+            assert all(isinstance(msg, str) for msg in feedback)
+
+
+class TestGetOrientationFeedback:
+    """Tests for get_orientation_feedback."""
+
+    def test_uses_primary_orientation(self):
+        """Should guide toward the first required orientation."""
+        assert get_orientation_feedback("front", ["side_left"]) == "Turn sideways to the camera"
+
+    def test_empty_required(self):
+        """No required orientation means no message."""
+        assert get_orientation_feedback("front", []) == ""
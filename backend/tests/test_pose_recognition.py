@@ -1,6 +1,15 @@
 """Tests for pose_recognition module."""
 
-from app.pose_recognition import YogaPoseRecognizer, detect_orientation, POSE_ORIENTATIONS
+import numpy as np
+
+from app.pose_recognition import (
+    ORIENTATIONS,
+    POSE_ORIENTATIONS,
+    YogaPoseRecognizer,
+    detect_orientation,
+    orientation_codes,
+)
+from app.utils.landmarks import landmarks_to_array
 
 
 class TestYogaPoseRecognizerInit:
@@ -21,6 +30,15 @@ class TestYogaPoseRecognizerInit:
             assert isinstance(config["angles"], dict)
             assert isinstance(config["tolerance"], int | float)
 
+    def test_reference_arrays_shared_and_read_only(self):
+        """Recognizers should share the module's read-only reference arrays."""
+        first = YogaPoseRecognizer()
+        second = YogaPoseRecognizer()
+
+        assert first.ref_angles is second.ref_angles
+        for array in (first.ref_angles, first.ref_mask, first.tolerances):
+            assert not array.flags.writeable
+
 
 class TestRecognize:
     """Tests for the recognize method."""
@@ -74,6 +92,39 @@ class TestRecognize:
         # Neutral standing should match Mountain Pose or similar
         assert pose != "Unknown"
 
+    def test_recognizes_standing_array(self, sample_landmarks, sample_landmarks_np):
+        """The detector's landmark array should be recognized without dictionaries."""
+        recognizer = YogaPoseRecognizer()
+
+        assert recognizer.recognize(sample_landmarks_np) == recognizer.recognize(sample_landmarks)
+
+    def test_accepts_landmark_array(self, warrior_ii_left_landmarks):
+        """A landmark array should be recognized like landmark dictionaries."""
+        recognizer = YogaPoseRecognizer()
+        array = landmarks_to_array(warrior_ii_left_landmarks)
+
+        assert recognizer.recognize(array) == recognizer.recognize(warrior_ii_left_landmarks)
+
+    def test_repeated_frame_uses_cache(self, warrior_ii_left_landmarks):
+        """A repeated frame should return the cached result object."""
+        recognizer = YogaPoseRecognizer()
+
+        first = recognizer.recognize(warrior_ii_left_landmarks)
+        second = recognizer.recognize(warrior_ii_left_landmarks)
+
+        assert second is first
+
+    def test_cache_distinguishes_poses(self, warrior_ii_left_landmarks, tree_pose_right_landmarks):
+        """Different poses should not share a cached result."""
+        recognizer = YogaPoseRecognizer()
+
+        warrior = recognizer.recognize(warrior_ii_left_landmarks)
+        tree = recognizer.recognize(tree_pose_right_landmarks)
+
+        assert warrior == YogaPoseRecognizer().recognize(warrior_ii_left_landmarks)
+        assert tree == YogaPoseRecognizer().recognize(tree_pose_right_landmarks)
+        assert warrior != tree
+
 
 class TestEvaluateTargetPose:
     """Tests for the evaluate_target_pose method."""
@@ -158,6 +209,16 @@ class TestEvaluateTargetPose:
 
         assert isinstance(orientation_valid, bool)
 
+    def test_accepts_landmark_array(self, warrior_ii_left_landmarks):
+        """A landmark array should evaluate the same as landmark dictionaries."""
+        recognizer = YogaPoseRecognizer()
+        array = landmarks_to_array(warrior_ii_left_landmarks)
+
+        from_dicts = recognizer.evaluate_target_pose(warrior_ii_left_landmarks, "Warrior II Left")
+        from_array = recognizer.evaluate_target_pose(array, "Warrior II Left")
+
+        assert from_array == from_dicts
+
 
 class TestCalculateAngles:
     """Tests for the _calculate_angles method."""
@@ -253,6 +314,44 @@ class TestCalculateSimilarity:
         assert 0.0 <= similarity <= 1.0
 
 
+class TestScoreAll:
+    """Tests for the vectorized _score_all method."""
+
+    def test_reference_arrays_match_reference_poses(self):
+        """Dense reference arrays should mirror reference_poses."""
+        recognizer = YogaPoseRecognizer()
+
+        assert recognizer.ref_angles.shape == (len(recognizer.reference_poses), 8)
+        for row, pose_name in enumerate(recognizer.pose_names):
+            assert recognizer.ref_mask[row].sum() == len(
+                recognizer.reference_poses[pose_name]["angles"]
+            )
+
+    def test_matches_calculate_similarity(self, warrior_ii_left_landmarks):
+        """Each pose score should equal the per-pose similarity."""
+        recognizer = YogaPoseRecognizer()
+        current = recognizer._calculate_angles(warrior_ii_left_landmarks)
+
+        scores = recognizer._score_all(recognizer._angle_vector(warrior_ii_left_landmarks))
+
+        for pose_name, score in zip(recognizer.pose_names, scores, strict=True):
+            config = recognizer.reference_poses[pose_name]
+            expected = recognizer._calculate_similarity(
+                current, config["angles"], config["tolerance"]
+            )
+            assert np.isclose(score, expected, atol=1e-5), pose_name
+
+    def test_single_row_matches_full_scores(self, warrior_ii_left_landmarks):
+        """Scoring one pose row should equal that entry of the full score vector."""
+        recognizer = YogaPoseRecognizer()
+        current = recognizer._angle_vector(warrior_ii_left_landmarks)
+        scores = recognizer._score_all(current)
+
+        row = recognizer.pose_index["Warrior II Left"]
+
+        assert np.isclose(recognizer._score_all(current, row), scores[row])
+
+
 class TestPosesWithFixtures:
     """Tests using pose fixtures."""
 
@@ -328,6 +427,39 @@ class TestDetectOrientation:
         # Width is 0.02 < 0.15, left z > right z, so side_left
         assert orientation == "side_left"
 
+    def test_accepts_landmark_array(self, sample_landmarks):
+        """Array input should give the same orientation as dictionaries."""
+        array = np.array([(lm["x"], lm["y"], lm["z"], lm["visibility"]) for lm in sample_landmarks])
+        assert detect_orientation(array) == detect_orientation(sample_landmarks)
+
+    def test_supine_when_hips_above_shoulders(self, sample_landmarks):
+        """Hips well above shoulders in the image should detect as supine."""
+        for i in (23, 24):
+            sample_landmarks[i]["y"] = 0.05
+        assert detect_orientation(sample_landmarks) == "supine"
+
+
+class TestOrientationCodes:
+    """Tests for the batched orientation_codes function."""
+
+    def test_batch_matches_detect_orientation(self):
+        """Each frame's code should name the orientation detect_orientation returns."""
+        rng = np.random.default_rng(0)
+        frames = rng.uniform(0.0, 1.0, size=(200, 33, 4)).astype(np.float32)
+
+        codes = orientation_codes(frames)
+
+        assert codes.shape == (200,)
+        for frame, code in zip(frames, codes, strict=True):
+            assert ORIENTATIONS[code] == detect_orientation(frame)
+
+    def test_covers_every_orientation(self):
+        """Random frames should exercise all four orientation codes."""
+        rng = np.random.default_rng(1)
+        frames = rng.uniform(0.0, 1.0, size=(500, 33, 4)).astype(np.float32)
+
+        assert set(orientation_codes(frames).tolist()) == set(range(len(ORIENTATIONS)))
+
 
 class TestPoseOrientations:
     """Tests for POSE_ORIENTATIONS configuration."""
@@ -1,40 +1,83 @@
 """Tests for session_generator module."""
 
+import math
+import random
+import re
+from operator import itemgetter
+
+import pytest
+
+from app.body_parts import BODY_PART_POSES, POSE_METADATA, get_pose_pair
 from app.session_generator import _order_poses, generate_session, get_session_preview
 
+TRANSITION_SECONDS = 5  # rest between consecutive poses in a session
+DURATION_TOLERANCE_SECONDS = 60  # allowed gap between a session's length and its target
+
+# Keys every generated session and every pose in it must have
+REQUIRED_SESSION_KEYS = frozenset(
+    {"id", "poses", "total_duration", "num_poses", "pain_areas", "improvement_areas"}
+)
+REQUIRED_POSE_KEYS = frozenset(
+    {"pose_name", "duration", "order", "is_pain_target", "is_improvement_target"}
+)
+
+# Canonical UUID4 string: 8-4-4-4-12 lowercase hex with version 4 and an RFC 4122 variant
+UUID4_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}\Z")
+
+
+def _indices(ordered: list[str], *names: str) -> tuple[int, ...]:
+    """Positions of the given pose names in an ordering, from one pass over it."""
+    index = {name: i for i, name in enumerate(ordered)}
+    return tuple(index[name] for name in names)
+
+
+# Inputs for the _order_poses tests, by case name
+ORDERING_CASES = {
+    "warmup_peak": ["Downward Dog", "Mountain Pose", "Plank"],
+    "peak_cooldown": ["Supine Bound Angle", "Downward Dog", "Plank"],
+    "warmup_first": ["Plank", "Mountain Pose", "Easy Seat", "Downward Dog"],
+    "cooldown_last": ["Hug the Knees", "Downward Dog", "Supine Bent Knees"],
+}
+
+
+@pytest.fixture(scope="module")
+def orderings() -> dict[str, list[str]]:
+    """_order_poses result for each ORDERING_CASES input, computed once per module."""
+    return {name: _order_poses(poses) for name, poses in ORDERING_CASES.items()}
+
+
+def _random_session_args(count: int, seed: int) -> list[tuple[list[str], list[str], int]]:
+    """Reproducible (pain_areas, improvement_areas, duration_minutes) samples."""
+    rng = random.Random(seed)
+    body_parts = list(BODY_PART_POSES)
+    return [
+        (
+            rng.sample(body_parts, rng.randint(0, len(body_parts))),
+            rng.sample(body_parts, rng.randint(0, len(body_parts))),
+            rng.randint(5, 60),
+        )
+        for _ in range(count)
+    ]
+
 
 class TestGenerateSession:
     """Tests for generate_session function."""
 
-    def test_returns_required_fields(self):
+    def test_returns_required_fields(self, neck_session):
         """Session should have all required fields."""
-        session = generate_session(["neck"], [], 10)
-
-        assert "id" in session
-        assert "poses" in session
-        assert "total_duration" in session
-        assert "num_poses" in session
-        assert "pain_areas" in session
-        assert "improvement_areas" in session
+        assert neck_session.keys() >= REQUIRED_SESSION_KEYS
 
-    def test_session_id_is_uuid(self):
+    def test_session_id_is_uuid(self, neck_session):
         """Session ID should be a valid UUID string."""
-        session = generate_session(["neck"], [], 10)
-        # UUID4 format: 8-4-4-4-12 hex characters
-        assert len(session["id"]) == 36
-        assert session["id"].count("-") == 4
+        assert UUID4_PATTERN.match(neck_session["id"])
 
-    def test_total_duration_matches_input(self):
+    def test_total_duration_matches_input(self, sessions_by_duration):
         """Total duration should match the requested duration."""
-        session = generate_session(["neck"], [], 15)
-        assert session["total_duration"] == 15
+        assert sessions_by_duration[15]["total_duration"] == 15
 
-    def test_empty_body_parts_returns_default_poses(self):
+    def test_empty_body_parts_returns_default_poses(self, default_session):
         """Empty pain and improvement areas should return default poses."""
-        session = generate_session([], [], 10)
-
-        pose_names = [p["pose_name"] for p in session["poses"]]
-        assert len(pose_names) >= 5  # Default sequence has 8 poses
+        assert len(default_session["poses"]) >= 5  # Default sequence has 8 poses
 
     def test_pain_areas_stored(self):
         """Session should store pain areas."""
@@ -46,155 +89,141 @@ class TestGenerateSession:
         session = generate_session([], ["balance", "core"], 10)
         assert session["improvement_areas"] == ["balance", "core"]
 
-    def test_pose_has_required_fields(self):
+    def test_pose_has_required_fields(self, neck_session):
         """Each pose should have required fields."""
-        session = generate_session(["neck"], [], 10)
-
-        for pose in session["poses"]:
-            assert "pose_name" in pose
-            assert "duration" in pose
-            assert "order" in pose
-            assert "is_pain_target" in pose
-            assert "is_improvement_target" in pose
+        for pose in neck_session["poses"]:
+            assert pose.keys() >= REQUIRED_POSE_KEYS
 
-    def test_pose_order_is_sequential(self):
+    def test_pose_order_is_sequential(self, hips_session):
         """Pose order should be sequential starting from 1."""
-        session = generate_session(["hips"], [], 10)
-
-        orders = [p["order"] for p in session["poses"]]
-        assert orders == list(range(1, len(orders) + 1))
+        for expected, pose in enumerate(hips_session["poses"], 1):
+            assert pose["order"] == expected
 
-    def test_num_poses_matches_pose_count(self):
+    def test_num_poses_matches_pose_count(self, neck_session):
         """num_poses should match the actual pose count."""
-        session = generate_session(["neck"], [], 10)
-        assert session["num_poses"] == len(session["poses"])
+        assert neck_session["num_poses"] == len(neck_session["poses"])
 
 
 class TestPainTargetBonus:
     """Tests for pain target duration bonus."""
 
-    def test_pain_target_marked(self):
+    def test_pain_target_marked(self, neck_session):
         """Poses targeting pain areas should be marked."""
-        session = generate_session(["neck"], [], 10)
-
-        pain_poses = [p for p in session["poses"] if p["is_pain_target"]]
+        pain_poses = [p for p in neck_session["poses"] if p["is_pain_target"]]
         assert len(pain_poses) > 0
 
-    def test_improvement_target_marked(self):
+    def test_improvement_target_marked(self, balance_session):
         """Poses targeting improvement areas should be marked."""
-        session = generate_session([], ["balance"], 10)
-
-        improvement_poses = [p for p in session["poses"] if p["is_improvement_target"]]
+        improvement_poses = [p for p in balance_session["poses"] if p["is_improvement_target"]]
         assert len(improvement_poses) > 0
 
 
 class TestAsymmetricPosePairing:
     """Tests for asymmetric pose auto-pairing."""
 
-    def test_warrior_ii_both_sides_included(self):
-        """If Warrior II Left is selected, Right should also be included."""
-        # hips targets Warrior II poses
-        session = generate_session(["hips"], [], 10)
-        pose_names = [p["pose_name"] for p in session["poses"]]
-
-        if "Warrior II Left" in pose_names:
-            assert "Warrior II Right" in pose_names
+    def test_warrior_ii_both_sides_included(self, hips_pose_names):
+        """Hip sessions should include both sides of Warrior II."""
+        # hips targets Warrior II poses; both sides are present, though they may not be
+        # adjacent after ordering into warmup/peak/cooldown
+        assert {"Warrior II Left", "Warrior II Right"} <= hips_pose_names
 
-    def test_tree_pose_both_sides_included(self):
-        """If Tree Pose Left is selected, Right should also be included."""
+    def test_tree_pose_both_sides_included(self, balance_pose_names):
+        """Balance sessions should include both sides of Tree Pose."""
         # balance targets Tree Pose
-        session = generate_session([], ["balance"], 10)
-        pose_names = [p["pose_name"] for p in session["poses"]]
-
-        if "Tree Pose Left" in pose_names:
-            assert "Tree Pose Right" in pose_names
-
-    def test_paired_poses_both_in_session(self):
-        """Both sides of paired poses should be in the session."""
-        session = generate_session(["hips"], [], 10)
-        pose_names = [p["pose_name"] for p in session["poses"]]
-
-        # Both sides should be present, though they may not be adjacent
-        # after ordering into warmup/peak/cooldown
-        has_warrior_left = "Warrior II Left" in pose_names
-        has_warrior_right = "Warrior II Right" in pose_names
-
-        # If one is present, both should be present
-        assert has_warrior_left == has_warrior_right
+        assert {"Tree Pose Left", "Tree Pose Right"} <= balance_pose_names
+
+
+class TestDifficultyFilter:
+    """Tests for the max_difficulty session filter."""
+
+    @pytest.mark.parametrize(
+        ("max_difficulty", "allowed"),
+        [("easy", {"easy"}), ("medium", {"easy", "medium"})],
+    )
+    def test_excludes_harder_poses(self, max_difficulty, allowed):
+        """Sessions should only contain poses up to the requested difficulty."""
+        session = generate_session(["shoulders", "core", "hips"], [], 30, max_difficulty)
+        difficulties = {POSE_METADATA[p["pose_name"]].difficulty for p in session["poses"]}
+        assert session["poses"]
+        assert difficulties <= allowed
+
+    def test_hard_keeps_every_pose(self):
+        """The hardest level should select the same poses as no filter."""
+        unfiltered = generate_session(["shoulders", "core"], [], 20)
+        hard = generate_session(["shoulders", "core"], [], 20, "hard")
+        assert [p["pose_name"] for p in hard["poses"]] == [
+            p["pose_name"] for p in unfiltered["poses"]
+        ]
+
+    def test_default_sequence_is_filtered(self):
+        """With no areas selected, the default sequence should be filtered too."""
+        session = generate_session([], [], 15, "easy")
+        names = {p["pose_name"] for p in session["poses"]}
+        assert names == {"Mountain Pose", "Easy Seat", "Supine Bent Knees"}
+
+    def test_all_poses_filtered_falls_back_to_default(self):
+        """Areas with no pose at the requested level should use the default sequence."""
+        session = generate_session(["core"], [], 15, "easy")
+        assert session["poses"]
+        assert all(POSE_METADATA[p["pose_name"]].difficulty == "easy" for p in session["poses"])
+
+    def test_preview_applies_filter(self):
+        """The preview should not count areas whose poses are all filtered out."""
+        preview = get_session_preview(["core"], [], "easy")
+        assert preview["targets_pain"] is False
 
 
 class TestPoseOrdering:
     """Tests for _order_poses function."""
 
-    def test_warmup_before_peak(self):
-        """Warmup poses should come before peak poses."""
-        poses = ["Downward Dog", "Mountain Pose", "Plank"]
-        ordered = _order_poses(poses)
-
-        mountain_idx = ordered.index("Mountain Pose")
-        downward_idx = ordered.index("Downward Dog")
-
-        assert mountain_idx < downward_idx
-
-    def test_peak_before_cooldown(self):
-        """Peak poses should come before cooldown poses."""
-        poses = ["Supine Bound Angle", "Downward Dog", "Plank"]
-        ordered = _order_poses(poses)
-
-        supine_idx = ordered.index("Supine Bound Angle")
-        downward_idx = ordered.index("Downward Dog")
-
-        assert downward_idx < supine_idx
+    @pytest.mark.parametrize(
+        ("case", "before", "after"),
+        [
+            # Warmup poses come before peak poses
+            ("warmup_peak", "Mountain Pose", "Downward Dog"),
+            ("warmup_first", "Mountain Pose", "Plank"),
+            # Peak poses come before cooldown poses
+            ("peak_cooldown", "Downward Dog", "Supine Bound Angle"),
+            ("cooldown_last", "Downward Dog", "Hug the Knees"),
+            ("cooldown_last", "Downward Dog", "Supine Bent Knees"),
+        ],
+    )
+    def test_phase_order(self, orderings, case, before, after):
+        """Poses from an earlier flow phase should come before later-phase poses."""
+        before_idx, after_idx = _indices(orderings[case], before, after)
+
+        assert before_idx < after_idx
 
     def test_empty_list_returns_empty(self):
         """Empty input should return empty output."""
         assert _order_poses([]) == []
 
-    def test_all_warmup_poses_at_start(self):
-        """All warmup poses should be at the start."""
-        poses = ["Plank", "Mountain Pose", "Easy Seat", "Downward Dog"]
-        ordered = _order_poses(poses)
-
-        # Mountain Pose is warmup
-        mountain_idx = ordered.index("Mountain Pose")
-        plank_idx = ordered.index("Plank")
-        assert mountain_idx < plank_idx
-
-    def test_all_cooldown_poses_at_end(self):
-        """All cooldown poses should be at the end."""
-        poses = ["Hug the Knees", "Downward Dog", "Supine Bent Knees"]
-        ordered = _order_poses(poses)
-
-        # Cooldown poses should be after peak
-        downward_idx = ordered.index("Downward Dog")
-        hug_idx = ordered.index("Hug the Knees")
-        supine_idx = ordered.index("Supine Bent Knees")
+    def test_cached_result_not_shared(self):
+        """Mutating a returned ordering should not affect later calls."""
+        poses = ["Plank", "Mountain Pose", "Supine Bent Knees"]
+        first = _order_poses(poses)
+        first.clear()
 
-        assert downward_idx < hug_idx
-        assert downward_idx < supine_idx
+        assert _order_poses(poses) == ["Mountain Pose", "Plank", "Supine Bent Knees"]
 
 
 class TestDurationScaling:
     """Tests for duration scaling to fit session time."""
 
-    def test_total_duration_approximately_matches_target(self):
+    @pytest.mark.parametrize("duration", [10, 15, 30])
+    def test_total_duration_approximately_matches_target(self, sessions_by_duration, duration):
         """Total pose durations plus transitions should approximate target."""
-        session = generate_session(["neck"], [], 10)
-
-        total_pose_time = sum(p["duration"] for p in session["poses"])
-        transition_time = (len(session["poses"]) - 1) * 5  # 5s between poses
+        poses = sessions_by_duration[duration]["poses"]
+        total_pose_time = sum(map(itemgetter("duration"), poses))
+        transition_time = (len(poses) - 1) * TRANSITION_SECONDS
         total_time = total_pose_time + transition_time
 
-        # Should be within 60 seconds of target (10 minutes = 600 seconds)
-        assert abs(total_time - 600) < 60
+        assert math.isclose(total_time, duration * 60, abs_tol=DURATION_TOLERANCE_SECONDS)
 
-    def test_longer_session_has_longer_durations(self):
+    def test_longer_session_has_longer_durations(self, sessions_by_duration):
         """Longer session should have longer pose durations."""
-        short_session = generate_session(["neck"], [], 10)
-        long_session = generate_session(["neck"], [], 30)
-
-        short_total = sum(p["duration"] for p in short_session["poses"])
-        long_total = sum(p["duration"] for p in long_session["poses"])
+        short_total = sum(map(itemgetter("duration"), sessions_by_duration[10]["poses"]))
+        long_total = sum(map(itemgetter("duration"), sessions_by_duration[30]["poses"]))
 
         assert long_total > short_total
 
@@ -202,37 +231,22 @@ class TestDurationScaling:
 class TestGetSessionPreview:
     """Tests for get_session_preview function."""
 
-    def test_returns_required_fields(self):
-        """Preview should have all required fields."""
-        preview = get_session_preview(["neck"], [])
-
-        assert "estimated_poses" in preview
-        assert "targets_pain" in preview
-        assert "targets_improvement" in preview
-
-    def test_targets_pain_true_when_pain_areas_given(self):
-        """targets_pain should be True when pain areas provided."""
-        preview = get_session_preview(["neck"], [])
-        assert preview["targets_pain"] is True
-
-    def test_targets_pain_false_when_no_pain_areas(self):
-        """targets_pain should be False when no pain areas."""
-        preview = get_session_preview([], ["balance"])
-        assert preview["targets_pain"] is False
-
-    def test_targets_improvement_true_when_improvement_areas_given(self):
-        """targets_improvement should be True when improvement areas provided."""
-        preview = get_session_preview([], ["balance"])
-        assert preview["targets_improvement"] is True
-
-    def test_targets_improvement_false_when_no_improvement_areas(self):
-        """targets_improvement should be False when no improvement areas."""
-        preview = get_session_preview(["neck"], [])
-        assert preview["targets_improvement"] is False
-
-    def test_minimum_poses_is_five(self):
-        """Estimated poses should be at least 5."""
-        preview = get_session_preview([], [])
+    @pytest.mark.parametrize(
+        ("pain_areas", "improvement_areas", "targets_pain", "targets_improvement"),
+        [
+            (["neck"], [], True, False),
+            ([], ["balance"], False, True),
+            ([], [], False, False),
+            (["neck", "shoulders", "hips", "core"], [], True, False),
+        ],
+    )
+    def test_preview_fields(self, pain_areas, improvement_areas, targets_pain, targets_improvement):
+        """Preview should flag the given areas and estimate at least 5 poses."""
+        preview = get_session_preview(pain_areas, improvement_areas)
+
+        assert preview.keys() >= {"estimated_poses", "targets_pain", "targets_improvement"}
+        assert preview["targets_pain"] is targets_pain
+        assert preview["targets_improvement"] is targets_improvement
         assert preview["estimated_poses"] >= 5
 
     def test_more_body_parts_more_poses(self):
@@ -243,3 +257,31 @@ class TestGetSessionPreview:
         # More body parts should generally mean more poses
         # (may be equal if overlapping poses)
         assert many_preview["estimated_poses"] >= few_preview["estimated_poses"]
+
+
+class TestSessionInvariants:
+    """Invariants that must hold for any combination of areas and duration."""
+
+    @pytest.mark.parametrize(
+        ("pain_areas", "improvement_areas", "duration"), _random_session_args(50, seed=2024)
+    )
+    def test_invariants(self, pain_areas, improvement_areas, duration):
+        """Generated sessions should be well-formed, paired and fit their duration."""
+        session = generate_session(pain_areas, improvement_areas, duration)
+        poses = session["poses"]
+        names = frozenset(map(itemgetter("pose_name"), poses))
+
+        assert session.keys() >= REQUIRED_SESSION_KEYS
+        assert session["pain_areas"] == pain_areas
+        assert session["improvement_areas"] == improvement_areas
+        assert session["total_duration"] == duration
+        assert session["num_poses"] == len(poses) == len(names)
+
+        for expected, pose in enumerate(poses, 1):
+            assert pose.keys() >= REQUIRED_POSE_KEYS
+            assert pose["order"] == expected
+            partner = get_pose_pair(pose["pose_name"])
+            assert partner is None or partner in names
+
+        total_time = sum(map(itemgetter("duration"), poses)) + (len(poses) - 1) * TRANSITION_SECONDS
+        assert math.isclose(total_time, duration * 60, abs_tol=DURATION_TOLERANCE_SECONDS)
@@ -23,6 +23,7 @@ export interface SessionGenerateRequest {
   pain_areas: string[];
   improvement_areas: string[];
   duration_minutes: number;
+  max_difficulty?: 'easy' | 'medium' | 'hard';
 }
 
 export interface SessionPreview {